@@ -171,4 +171,18 @@ export async function fetchTournamentCounts(): Promise<{ [status: string]: numbe
     });
     if (!response.ok) throw new Error('Failed to fetch tournament counts');
     return await response.json();
-}
\ No newline at end of file
+}
+
+
+export async function fetchTournamentDashboard(): Promise<{ [status: string]: { count: number, tournaments: Tournament[], next_cursor: string | null } }> {
+    const url = new URL(`${fastApiBaseUrl}/tournament/dashboard`);
+    const response = await apiFetch(url.toString(), {
+        method: 'GET',
+        headers: {
+            'Content-Type': 'application/json',
+            'Authorization': `Bearer ${getToken()}`
+        },
+    });
+    if (!response.ok) throw new Error('Failed to fetch tournament dashboard');
+    return await response.json();
+}
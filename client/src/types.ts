@@ -47,9 +47,10 @@ export interface Matchup {
     white_player: Player;
     black_player: Player;
     result?: MatchResult;
+    version?: number;
 }
 
-export type MatchupResult = { matchupId: string; result: string };
+export type MatchupResult = { matchupId: string; result: string; version?: number };
 
 export interface Tournament {
     id: number;
@@ -30,10 +30,11 @@ export function attachSaveResultsButtonHandler(currentTournament: Tournament) {
         selects.forEach(select => {
             const matchupId = (select as HTMLSelectElement).getAttribute('data-matchup-id');
             const result = (select as HTMLSelectElement).value;
+            const version = (select as HTMLSelectElement).getAttribute('data-matchup-version');
             if (!result) {
                 missing = true;
             }
-            results.push({ matchupId: matchupId!, result });
+            results.push({ matchupId: matchupId!, result, ...(version ? { version: Number(version) } : {}) });
         });
 
         if (missing) {
@@ -112,7 +113,7 @@ export function renderSelectedRound(currentTournament: Tournament) {
                                 <td class="px-4 py-2 border-b text-center">
                                     ${
                                         currentTournament!.status === "Ongoing"
-                                        ? `<select class="result-select text-center" data-matchup-id="${m.id}" style="text-align-last: center;">
+                                        ? `<select class="result-select text-center" data-matchup-id="${m.id}" data-matchup-version="${m.version ?? ''}" style="text-align-last: center;">
                                                 <option value="" ${!m.result ? "selected" : ""}>Select</option>
                                                 <option value="White-Wins" ${m.result === "White-Wins" ? "selected" : ""}>1 - 0</option>
                                                 <option value="Black-Wins" ${m.result === "Black-Wins" ? "selected" : ""}>0 - 1</option>
@@ -13,9 +13,8 @@ import {
     createTournament,
     updateTournament,
     fetchTournament,
-    fetchTournaments,
     endTournament,
-    fetchTournamentCounts
+    fetchTournamentDashboard
 } from '../api/tournamentAPI.js'
 
 import {
@@ -174,11 +173,16 @@ export function attachTournamentOperationListeners() {
 
     // Render a specific tournament
     document.querySelectorAll('.tournament-card').forEach(card => {
-        card.addEventListener('click', () => {
+        card.addEventListener('click', async () => {
             const tournamentId = (card as HTMLElement).getAttribute('data-tournament-id');
             if (!tournamentId) return;
-            const tournaments = getTournaments();
-            setCurrentTournament(tournaments.find(t => t.id == Number(tournamentId)) || null);
+            // Lists carry no rounds: load the full tournament before opening it.
+            try {
+                setCurrentTournament(await fetchTournament(Number(tournamentId)));
+            } catch (error: any) {
+                Modal.show(`Failed to load tournament: ${error.message}`);
+                return;
+            }
             setCurrentView('viewTournamentDetail');
             renderApp();
         });
@@ -383,7 +387,11 @@ export async function renderTournamentsTabContent() {
     if (tournamentTab === "Finished") statusFilter = "Finished";
 
     try {
-        setTournaments(await fetchTournaments(statusFilter));
+        // One request for the tab counts and the first page of every tab.
+        const dashboard = await fetchTournamentDashboard();
+        setTournaments(statusFilter
+            ? dashboard[statusFilter]?.tournaments ?? []
+            : Object.values(dashboard).flatMap(section => section.tournaments));
         const filtered = getTournaments().filter(t => {
             const status = normalizeStatus(t.status);
             if (tournamentTab === "Not Started") return status === "notstarted";
@@ -441,10 +449,9 @@ export async function renderTournamentsTabContent() {
             `;
         }
 
-        const counts = await fetchTournamentCounts();
-        const notStartedCount = counts["Not Started"] || 0;
-        const ongoingCount = counts["Ongoing"] || 0;
-        const finishedCount = counts["Finished"] || 0;
+        const notStartedCount = dashboard["Not Started"]?.count || 0;
+        const ongoingCount = dashboard["Ongoing"]?.count || 0;
+        const finishedCount = dashboard["Finished"]?.count || 0;
 
         // Tabs HTML
         const tournamentsHtml = `
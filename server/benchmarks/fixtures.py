@@ -0,0 +1,66 @@
+'''
+Throwaway data for the benchmark scripts.
+Everything hangs off a single bench user, so deleting that user cascades through
+its tournaments, players, rounds and matchups.
+'''
+import uuid
+from datetime import date
+
+from sqlalchemy import insert, delete
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from src.db.db import Session
+from src.db.models import User, Tournament, Player
+from src.tournament.field import synthetic_field
+from src.utils.enums import Format, TimeControl, RatingDistribution
+
+
+async def create_bench_user(session: AsyncSession) -> User:
+    tag = uuid.uuid4().hex[:8]
+    user = User(
+        username=f"bench_{tag}",
+        email=f"bench_{tag}@example.com",
+        hashed_pass="",
+        role="user",
+        is_verified=True,
+    )
+    session.add(user)
+    await session.commit()
+    await session.refresh(user)
+    return user
+
+
+async def create_bench_tournament(
+    manager_id: int,
+    nb_of_players: int,
+    session: AsyncSession,
+    format: Format = Format.ROUND_ROBIN,
+    distribution: RatingDistribution = RatingDistribution.UNIFORM,
+    seed: int | None = None
+) -> Tournament:
+    tournament = Tournament(
+        name=f"bench_{uuid.uuid4().hex[:12]}",
+        location="Bench",
+        time_control=TimeControl.BLITZ,
+        format=format,
+        start_date=date.today(),
+        end_date=date.today(),
+        nb_of_players=nb_of_players,
+        manager_id=manager_id,
+    )
+    session.add(tournament)
+    await session.commit()
+    await session.refresh(tournament)
+
+    rows = [
+        {"name": name, "rating": rating, "tournament_id": tournament.id}
+        for name, rating in synthetic_field(nb_of_players, distribution=distribution, seed=seed, prefix="P")
+    ]
+    await session.exec(insert(Player).values(rows))
+    await session.commit()
+    return tournament
+
+
+async def drop_bench_user(user_id: int, session: AsyncSession) -> None:
+    await session.exec(delete(User).where(User.id == user_id))
+    await session.commit()
@@ -0,0 +1,87 @@
+'''
+Move latency through the Lichess proxy: a new httpx client per call (the old routes)
+against the shared pooled LichessClient. Runs against a local stub server, so only the
+client side cost (client setup, connection handshake, pooling) is measured:
+    python -m benchmarks.lichess_client
+'''
+import asyncio
+import statistics
+import time
+
+import httpx
+
+from src.lichess.service import LichessClient
+
+MOVES = 500
+STUB_LATENCY = 0.001  # seconds the stub takes to "play" a move
+BODY = b'{"ok":true}'
+
+
+async def handle(reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+    '''
+    Minimal HTTP/1.1 keep-alive server answering every request with {"ok": true}.
+    '''
+    try:
+        while True:
+            head = await reader.readuntil(b"\r\n\r\n")
+            for line in head.split(b"\r\n"):
+                if line.lower().startswith(b"content-length:"):
+                    await reader.readexactly(int(line.split(b":")[1]))
+            await asyncio.sleep(STUB_LATENCY)
+            writer.write(
+                b"HTTP/1.1 200 OK\r\nContent-Type: application/json\r\n"
+                b"Content-Length: %d\r\n\r\n%s" % (len(BODY), BODY)
+            )
+            await writer.drain()
+    except (asyncio.IncompleteReadError, ConnectionError):
+        pass
+    finally:
+        writer.close()
+
+
+def move_path(i: int) -> str:
+    return f"/api/board/game/bench{i % 10}/move/e2e4"
+
+
+async def client_per_call(base_url: str) -> list[float]:
+    timings = []
+    for i in range(MOVES):
+        start = time.perf_counter()
+        async with httpx.AsyncClient(base_url=base_url) as client:
+            await client.post(move_path(i), headers={"Authorization": "Bearer bench"})
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+async def shared_client(base_url: str) -> list[float]:
+    lichess = LichessClient()
+    lichess.open(base_url)
+    timings = []
+    try:
+        for i in range(MOVES):
+            start = time.perf_counter()
+            await lichess.post(move_path(i), "bench")
+            timings.append(time.perf_counter() - start)
+    finally:
+        await lichess.close()
+    return timings
+
+
+def report(name: str, timings: list[float]) -> None:
+    timings = sorted(timings)
+    p95 = timings[int(len(timings) * 0.95)]
+    print(f"{name:<20}{statistics.median(timings) * 1000:>12.2f}{p95 * 1000:>10.2f}")
+
+
+async def main():
+    server = await asyncio.start_server(handle, "127.0.0.1", 0)
+    port = server.sockets[0].getsockname()[1]
+    base_url = f"http://127.0.0.1:{port}"
+    async with server:
+        print(f"{'client':<20}{'median ms':>12}{'p95 ms':>10}")
+        report("client per call", await client_per_call(base_url))
+        report("shared client", await shared_client(base_url))
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
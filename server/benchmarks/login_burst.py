@@ -0,0 +1,85 @@
+'''
+Event loop lag while a burst of logins hashes passwords.
+"inline" runs bcrypt on the event loop like the old Hash did, "pool" goes through the
+bounded hashing pool. Needs the usual .env, no database:
+    python -m benchmarks.login_burst
+
+A probe task is started before the burst and sends a cheap request every PROBE_INTERVAL.
+Each probe is timed from the moment it was scheduled to be sent, not from when the loop
+got around to sending it, so time spent blocked behind a hash counts as lag. Only probes
+scheduled during the burst are reported.
+'''
+import asyncio
+import statistics
+import time
+
+import httpx
+
+from src.main import app
+from src.auth.utils import Hash, pwd_cxt
+from src.utils.config import Config
+
+LOGINS = 32
+PROBE_INTERVAL = 0.01
+
+
+async def inline_login(hashed: str) -> None:
+    pwd_cxt.verify("bench-password", hashed)
+    await asyncio.sleep(0)
+
+
+async def pool_login(hashed: str) -> None:
+    await Hash.verify(hashed, "bench-password")
+
+
+async def probe(client: httpx.AsyncClient, start: float, done: asyncio.Event) -> list[tuple[float, float]]:
+    '''
+    (scheduled send time, lag) of each probe until the burst is done.
+    A probe that should have been sent while the loop was blocked is sent late, and counts from its schedule.
+    '''
+    probes = []
+    number = 0
+    while not done.is_set():
+        scheduled = start + number * PROBE_INTERVAL
+        await asyncio.sleep(max(0, scheduled - time.perf_counter()))
+        await client.get("/api/v1/metrics")
+        probes.append((scheduled, time.perf_counter() - scheduled))
+        number += 1
+    return probes
+
+
+async def run(name: str, login, hashed: str) -> None:
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        await client.get("/api/v1/metrics")  # warm up outside the measured window
+        done = asyncio.Event()
+        probes = asyncio.create_task(probe(client, time.perf_counter(), done))
+        await asyncio.sleep(PROBE_INTERVAL)  # the probe is running before the burst starts
+
+        start = time.perf_counter()
+        await asyncio.gather(*(login(hashed) for _ in range(LOGINS)))
+        end = time.perf_counter()
+        done.set()
+        lags = sorted(lag for scheduled, lag in await probes if start <= scheduled <= end)
+
+    if not lags:
+        print(f"{name:<10}{(end - start) * 1000:>12.0f}{'no probe scheduled during the burst':>34}")
+        return
+    p95 = lags[min(len(lags) - 1, int(len(lags) * 0.95))]
+    print(
+        f"{name:<10}{(end - start) * 1000:>12.0f}{len(lags):>8}"
+        f"{statistics.median(lags) * 1000:>12.2f}{p95 * 1000:>10.2f}{lags[-1] * 1000:>10.2f}"
+    )
+
+
+async def main():
+    hashed = pwd_cxt.hash("bench-password")
+    print(f"{LOGINS} logins, bcrypt rounds {Config.BCRYPT_ROUNDS}, {Config.HASH_WORKERS} hash workers, "
+          f"a probe every {PROBE_INTERVAL * 1000:.0f} ms")
+    print(f"{'mode':<10}{'burst ms':>12}{'probes':>8}{'lag p50':>12}{'p95 ms':>10}{'max ms':>10}")
+    await run("inline", inline_login, hashed)
+    await run("pool", pool_login, hashed)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
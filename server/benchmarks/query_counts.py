@@ -0,0 +1,87 @@
+'''
+Query-count regression check for the fetch plans.
+Counts the SQL statements every endpoint's service call sends, each in a fresh session
+like a request, and exits 1 when a count differs from the pinned one.
+Run from the server directory against a migrated scratch database:
+    python -m benchmarks.query_counts
+'''
+import asyncio
+import sys
+from contextlib import contextmanager
+
+from sqlalchemy import event
+
+from src.auth.service import UserService
+from src.db.db import async_engine
+from src.player.service import PlayerService
+from src.tournament.service import TournamentService
+from src.utils.enums import Status
+from .fixtures import Session, create_bench_user, create_bench_tournament, drop_bench_user
+
+# Statements per endpoint. Update on purpose only: a higher number is an N+1 or a lost fetch plan.
+EXPECTED = {
+    "auth (get_user)": 1,
+    "tournament list": 2,  # tournaments + players, whatever the page size (no rounds in lists)
+    "tournament detail": 4,
+    "tournament counts": 1,
+    "dashboard": 1,  # ranked tournaments, counts and players (LATERAL json_agg) in one statement
+    "standings": 1,
+    "players": 1,
+}
+
+tournament_service = TournamentService()
+player_service = PlayerService()
+user_service = UserService()
+
+
+@contextmanager
+def count_statements():
+    counter = {"statements": 0}
+
+    def count(conn, cursor, statement, parameters, context, executemany):
+        counter["statements"] += 1
+
+    event.listen(async_engine.sync_engine, "before_cursor_execute", count)
+    try:
+        yield counter
+    finally:
+        event.remove(async_engine.sync_engine, "before_cursor_execute", count)
+
+
+async def main() -> int:
+    async with Session() as session:
+        user = await create_bench_user(session)
+    try:
+        async with Session() as session:
+            for _ in range(5):
+                tournament = await create_bench_tournament(user.id, 8, session)
+                await tournament_service.start_tournament(tournament.id, session)
+            tournament_id = tournament.id
+
+        calls = {
+            "auth (get_user)": lambda s: user_service.get_user(user.id, s),
+            "tournament list": lambda s: tournament_service.get_all_tournaments(user.id, 10, "desc", Status.ONGOING.value, s),
+            "tournament detail": lambda s: tournament_service.get_tournament(tournament_id, s),
+            "tournament counts": lambda s: tournament_service.total_tournaments(user.id, s),
+            "dashboard": lambda s: tournament_service.get_dashboard(user.id, 10, s),
+            "standings": lambda s: tournament_service.get_standings(tournament_id, s),
+            "players": lambda s: player_service.get_players(tournament_id, s),
+        }
+
+        failed = False
+        print(f"{'endpoint':<20}{'expected':>10}{'actual':>8}")
+        for name, call in calls.items():
+            async with Session() as session:
+                with count_statements() as counter:
+                    await call(session)
+            actual = counter["statements"]
+            failed |= actual != EXPECTED[name]
+            print(f"{name:<20}{EXPECTED[name]:>10}{actual:>8}{'' if actual == EXPECTED[name] else '  FAIL'}")
+        return 1 if failed else 0
+    finally:
+        async with Session() as session:
+            await drop_bench_user(user.id, session)
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
@@ -0,0 +1,96 @@
+'''
+Query plan check for the hot query paths.
+Seeds a bench user with a few tournaments, then EXPLAINs every hot query with sequential
+scans disabled: the planner still falls back to a Seq Scan when no index can serve the
+query, so any Seq Scan left in a plan means a missing index. Exits 1 in that case.
+Run from the server directory against a migrated scratch database:
+    python -m benchmarks.query_plans
+'''
+import asyncio
+import json
+import sys
+from datetime import date
+
+from sqlalchemy import func, text
+from sqlalchemy.dialects import postgresql
+from sqlmodel import select, desc
+
+from src.db.models import Tournament, Round, Matchup, Player, Standing
+from src.tournament.service import TournamentService
+from src.utils.enums import Status, Format
+from src.utils.pagination import keyset
+from .fixtures import Session, create_bench_user, create_bench_tournament, drop_bench_user
+
+service = TournamentService()
+
+
+def hot_queries(manager_id: int, tournament_id: int, round_id: int) -> dict:
+    return {
+        "fetch_tournaments": select(Tournament)
+            .where((Tournament.manager_id == manager_id) & (Tournament.status == Status.ONGOING))
+            .order_by(desc(Tournament.start_date)).limit(10),
+        "tournaments_page": keyset(
+            select(Tournament).where(
+                (Tournament.manager_id == manager_id) & (Tournament.status == Status.ONGOING)
+                & (Tournament.format == Format.SWISS)
+            ),
+            (Tournament.start_date, Tournament.id), (date.today(), 1_000_000), True, 10
+        ),
+        "tournament_counts": select(Tournament.status, func.count())
+            .where(Tournament.manager_id == manager_id).group_by(Tournament.status),
+        "round_lookup": select(Round)
+            .where((Round.tournament_id == tournament_id) & (Round.round_number == 1)),
+        "round_matchups": select(Matchup).where(Matchup.round_id == round_id),
+        # the lookups ON DELETE CASCADE runs when players are deleted
+        "white_matchups": select(Matchup.id).where(Matchup.white_player_id == 1),
+        "black_matchups": select(Matchup.id).where(Matchup.black_player_id == 1),
+        "player_name_check": select(Player)
+            .where((Player.name == "P1") & (Player.tournament_id == tournament_id)),
+        "players_page": keyset(
+            select(Player).where(Player.tournament_id == tournament_id),
+            (Player.rating, Player.id), (3000, 1_000_000), True, 20
+        ),
+        "tournament_players": select(Player).where(Player.tournament_id == tournament_id),
+        "standings": select(Standing).where(Standing.tournament_id == tournament_id),
+    }
+
+
+def seq_scans(plan: dict) -> list[str]:
+    found = [plan["Relation Name"]] if plan["Node Type"] == "Seq Scan" else []
+    for child in plan.get("Plans", []):
+        found += seq_scans(child)
+    return found
+
+
+async def main() -> int:
+    async with Session() as session:
+        user = await create_bench_user(session)
+    try:
+        async with Session() as session:
+            for _ in range(3):
+                await create_bench_tournament(user.id, 8, session)
+            tournament = await create_bench_tournament(user.id, 16, session)
+            tournament = await service.start_tournament(tournament.id, session)
+            round_id = next(r.id for r in tournament.rounds if r.round_number == 1)
+            await session.exec(text("ANALYZE tournaments, rounds, matchups, players, standings"))
+            await session.commit()
+
+        failed = False
+        async with Session() as session:
+            await session.exec(text("SET LOCAL enable_seqscan = off"))
+            for name, statement in hot_queries(user.id, tournament.id, round_id).items():
+                sql = statement.compile(dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True})
+                result = await session.exec(text(f"EXPLAIN (FORMAT JSON) {sql}"))
+                plan = result.scalar()
+                plan = (json.loads(plan) if isinstance(plan, str) else plan)[0]["Plan"]
+                scans = seq_scans(plan)
+                failed |= bool(scans)
+                print(f"{name:<20}{'SEQ SCAN on ' + ', '.join(scans) if scans else 'ok'}")
+        return 1 if failed else 0
+    finally:
+        async with Session() as session:
+            await drop_bench_user(user.id, session)
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
@@ -0,0 +1,84 @@
+'''
+Correctness check of the Berger tables, for every tournament size (2 to 64 players),
+single and double round robin. No database needed, exits 1 on the first broken property:
+    python -m benchmarks.round_robin_check
+'''
+import sys
+import time
+from collections import Counter
+from itertools import combinations
+
+from src.tournament.round_robin import MAX_PLAYERS, berger_table, table_size, round_robin_pairings, seed_by_rating
+
+
+def check(nb_of_players: int, double: bool) -> list[str]:
+    player_ids = list(range(101, 101 + nb_of_players))
+    rounds = round_robin_pairings(player_ids, double)
+    cycle = nb_of_players - 1 + nb_of_players % 2
+    cycles = 2 if double else 1
+    errors = []
+
+    if len(rounds) != cycle * cycles:
+        errors.append(f"{len(rounds)} rounds, expected {cycle * cycles}")
+
+    games = Counter()
+    colors = {p: "" for p in player_ids}
+    byes = Counter()
+    for number, pairings in enumerate(rounds, start=1):
+        seen = [p for pair in pairings for p in pair if p is not None]
+        if sorted(seen) != player_ids:
+            errors.append(f"round {number}: not every player plays exactly once")
+        for white, black in pairings:
+            if white is None or black is None:
+                byes[white if black is None else black] += 1
+                continue
+            games[(white, black)] += 1
+            colors[white] += "W"
+            colors[black] += "B"
+
+    for a, b in combinations(player_ids, 2):
+        if double and (games[(a, b)], games[(b, a)]) != (1, 1):
+            errors.append(f"{a} and {b} do not meet once with each colour")
+        if not double and games[(a, b)] + games[(b, a)] != 1:
+            errors.append(f"{a} and {b} meet {games[(a, b)] + games[(b, a)]} times")
+    if nb_of_players % 2 and any(byes[p] != cycles for p in player_ids):
+        errors.append("byes are not spread one per player and cycle")
+    if not nb_of_players % 2 and byes:
+        errors.append("byes with an even number of players")
+    for p, sequence in colors.items():
+        first = sequence[:len(sequence) // cycles]
+        if abs(first.count("W") - first.count("B")) > 1:
+            errors.append(f"{p} colours unbalanced: {first}")
+    return errors[:5]
+
+
+def main() -> int:
+    failed = False
+    for nb_of_players in range(2, MAX_PLAYERS + 1):
+        for double in (False, True):
+            errors = check(nb_of_players, double)
+            failed |= bool(errors)
+            for error in errors:
+                print(f"{nb_of_players:>3} players{' (double)' if double else ''}: {error}")
+
+    seeded = seed_by_rating([(1, 1500), (2, 2100), (3, 1500), (4, 900)])
+    if seeded != [2, 1, 3, 4]:
+        print(f"seed_by_rating: {seeded}")
+        failed = True
+
+    # Tables are cached: scheduling only maps seats to ids.
+    berger_table.cache_clear()
+    start = time.perf_counter()
+    round_robin_pairings(list(range(MAX_PLAYERS)))
+    cold = time.perf_counter() - start
+    start = time.perf_counter()
+    round_robin_pairings(list(range(MAX_PLAYERS)))
+    warm = time.perf_counter() - start
+    print(f"{'ok' if not failed else 'FAILED'}: sizes 2-{MAX_PLAYERS}, "
+          f"{MAX_PLAYERS} players cold {cold * 1000:.2f} ms, cached {warm * 1000:.2f} ms, "
+          f"{len(berger_table(table_size(MAX_PLAYERS)))} rounds")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,47 @@
+'''
+Start latency of TournamentService.start_tournament.
+Run from the server directory against a scratch database (DATABASE_URL from .env):
+    python -m benchmarks.start_tournament
+'''
+import asyncio
+import statistics
+import time
+
+from src.tournament.service import TournamentService
+from src.utils.enums import Format
+from .fixtures import Session, create_bench_user, create_bench_tournament, drop_bench_user
+
+SIZES = (8, 32, 64)
+RUNS = 5
+
+service = TournamentService()
+
+
+async def time_start(manager_id: int, nb_of_players: int, format: Format, seed: int) -> float:
+    async with Session() as session:
+        # Seeded fields: every run of the script starts the same tournaments.
+        tournament = await create_bench_tournament(manager_id, nb_of_players, session, format, seed=seed)
+        tournament_id = tournament.id
+    # Fresh session, so the measured call pays for its own loading like a request does.
+    async with Session() as session:
+        start = time.perf_counter()
+        await service.start_tournament(tournament_id, session)
+        return time.perf_counter() - start
+
+
+async def main():
+    async with Session() as session:
+        user = await create_bench_user(session)
+    try:
+        print(f"{'format':<20}{'players':>8}{'median ms':>12}{'max ms':>10}")
+        for format in (Format.ROUND_ROBIN, Format.DOUBLE_ROUND_ROBIN):
+            for size in SIZES:
+                timings = [await time_start(user.id, size, format, run) for run in range(RUNS)]
+                print(f"{format.value:<20}{size:>8}{statistics.median(timings) * 1000:>12.1f}{max(timings) * 1000:>10.1f}")
+    finally:
+        async with Session() as session:
+            await drop_bench_user(user.id, session)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,45 @@
+'''
+Pairing time of the Swiss engine, no database needed.
+Plays out a full event with random results and times every pair_round call:
+    python -m benchmarks.swiss_pairing
+'''
+import random
+import statistics
+import time
+
+from src.tournament.swiss import Entrant, pair_round, record_pairings
+from src.tournament.scoring import result_points
+from src.utils.enums import Result
+
+SIZES = (8, 32, 64, 65)
+RUNS = 20
+OUTCOMES = (Result.WHITE_WINS, Result.BLACK_WINS, Result.DRAW)
+
+
+def play_event(nb_of_players: int, nb_of_rounds: int, rng: random.Random) -> list[float]:
+    entrants = {i: Entrant(id=i, rating=rng.randint(400, 4000)) for i in range(1, nb_of_players + 1)}
+    timings = []
+    for _ in range(nb_of_rounds):
+        start = time.perf_counter()
+        pairings, bye_id = pair_round(list(entrants.values()))
+        timings.append(time.perf_counter() - start)
+
+        record_pairings(entrants, pairings, bye_id)
+        for white_id, black_id in pairings:
+            white_points, black_points = result_points(rng.choice(OUTCOMES))
+            entrants[white_id].score += white_points
+            entrants[black_id].score += black_points
+    return timings
+
+
+def main():
+    rng = random.Random(42)
+    print(f"{'players':>8}{'rounds':>8}{'median ms':>12}{'max ms':>10}")
+    for size in SIZES:
+        nb_of_rounds = max(1, (size - 1).bit_length() + 2)
+        timings = [t for _ in range(RUNS) for t in play_event(size, nb_of_rounds, rng)]
+        print(f"{size:>8}{nb_of_rounds:>8}{statistics.median(timings) * 1000:>12.2f}{max(timings) * 1000:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,37 @@
+"""Add listing keyset indexes
+
+Revision ID: 5c2e8b91d4f3
+Revises: a93c5e1f7b20
+Create Date: 2026-10-18 17:41:36.204817
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5c2e8b91d4f3'
+down_revision: Union[str, Sequence[str], None] = 'a93c5e1f7b20'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.drop_index('ix_tournaments_manager_status_start', table_name='tournaments')
+    op.create_index('ix_tournaments_manager_status_start', 'tournaments', ['manager_id', 'status', 'start_date', 'id'], unique=False)
+    op.create_index('ix_tournaments_manager_status_format_start', 'tournaments', ['manager_id', 'status', 'format', 'start_date', 'id'], unique=False)
+    op.create_index('ix_tournaments_manager_status_time_control_start', 'tournaments', ['manager_id', 'status', 'time_control', 'start_date', 'id'], unique=False)
+    op.create_index('ix_players_tournament_rating', 'players', ['tournament_id', 'rating', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_players_tournament_rating', table_name='players')
+    op.drop_index('ix_tournaments_manager_status_time_control_start', table_name='tournaments')
+    op.drop_index('ix_tournaments_manager_status_format_start', table_name='tournaments')
+    op.drop_index('ix_tournaments_manager_status_start', table_name='tournaments')
+    op.create_index('ix_tournaments_manager_status_start', 'tournaments', ['manager_id', 'status', 'start_date'], unique=False)
@@ -0,0 +1,31 @@
+"""Index matchup player foreign keys
+
+Revision ID: 7f4d2a6b9c15
+Revises: e3b7c09a41d6
+Create Date: 2026-10-18 19:58:44.610239
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7f4d2a6b9c15'
+down_revision: Union[str, Sequence[str], None] = 'e3b7c09a41d6'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_matchups_white_player_id', 'matchups', ['white_player_id'], unique=False)
+    op.create_index('ix_matchups_black_player_id', 'matchups', ['black_player_id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_matchups_black_player_id', table_name='matchups')
+    op.drop_index('ix_matchups_white_player_id', table_name='matchups')
@@ -0,0 +1,38 @@
+"""Add hot path indexes
+
+Revision ID: a93c5e1f7b20
+Revises: d4a81f3e6c07
+Create Date: 2026-10-18 15:02:11.528310
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a93c5e1f7b20'
+down_revision: Union[str, Sequence[str], None] = 'd4a81f3e6c07'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_tournaments_manager_status_start', 'tournaments', ['manager_id', 'status', 'start_date'], unique=False)
+    op.create_index('ix_rounds_tournament_round', 'rounds', ['tournament_id', 'round_number'], unique=False)
+    op.create_index(
+        'ix_matchups_round_id', 'matchups', ['round_id'], unique=False,
+        postgresql_include=['id', 'white_player_id', 'black_player_id', 'result']
+    )
+    op.create_index('ix_players_tournament_name', 'players', ['tournament_id', 'name'], unique=False, postgresql_include=['rating'])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_players_tournament_name', table_name='players')
+    op.drop_index('ix_matchups_round_id', table_name='matchups')
+    op.drop_index('ix_rounds_tournament_round', table_name='rounds')
+    op.drop_index('ix_tournaments_manager_status_start', table_name='tournaments')
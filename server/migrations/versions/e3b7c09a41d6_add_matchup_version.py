@@ -0,0 +1,29 @@
+"""Add matchup version
+
+Revision ID: e3b7c09a41d6
+Revises: 5c2e8b91d4f3
+Create Date: 2026-10-18 18:26:03.917452
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e3b7c09a41d6'
+down_revision: Union[str, Sequence[str], None] = '5c2e8b91d4f3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('matchups', sa.Column('version', sa.Integer(), server_default='0', nullable=False))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('matchups', 'version')
@@ -4,10 +4,11 @@ from fastapi.security import HTTPBearer
 from fastapi.security.http import HTTPAuthorizationCredentials
 from sqlmodel.ext.asyncio.session import AsyncSession
 
-from src.db.db import get_session
+from src.db.db import get_session, Session, ReplicaSession, replica_engine
 from src.db.models import User
-from src.db.redis import token_in_blocklist
+from src.db.redis import token_in_blocklist, credential_cache, principal_key, user_auth_tag, wrote_recently
 from .service import UserService
+from .schemas import Principal
 from .utils import *
 
 from src.utils.errors import *
@@ -70,6 +71,61 @@ async def get_current_user(
     return user
 
 
+async def get_current_principal(
+    token_details: dict = Depends(AccessTokenBearer()),
+    session: AsyncSession = Depends(get_session)
+) -> Principal:
+    '''
+    Id, role and verification state of the logged in user, without the full User row.
+    Served from the credential cache, so most requests are authorized with no database round trip.
+    Use get_current_user only when the route needs the whole user.
+    '''
+    user_id = token_details['user_id']
+    key = principal_key(user_id)
+    principal = credential_cache.get(key)
+    if principal is None:
+        epoch = credential_cache.epoch()
+        user = await service.get_user(user_id, session)
+        principal = Principal(id=user.id, username=user.username, role=user.role, is_verified=user.is_verified)
+        credential_cache.set(key, principal, user_auth_tag(user_id), epoch)
+    return principal
+
+
+async def get_lichess_token(
+    token_details: dict = Depends(AccessTokenBearer()),
+    session: AsyncSession = Depends(get_session)
+) -> str:
+    '''
+    Decrypted Lichess token of the logged in user.
+    Served from the credential cache when possible, so hot Lichess endpoints skip both
+    the user lookup and the Fernet decryption.
+    '''
+    user_id = token_details['user_id']
+    token = cached_lichess_token(user_id)
+    if token is not None:
+        return token
+    epoch = credential_cache.epoch()
+    user = await service.get_user(user_id, session)
+    return get_user_lichess_token(user_id, user.lichess_token, epoch)
+
+
+optional_bearer = HTTPBearer(auto_error=False)
+
+async def get_read_session(creds: HTTPAuthorizationCredentials | None = Depends(optional_bearer)):
+    '''
+    Session for read only routes: the read replica when one is configured.
+    A user who just wrote stays on the primary for REPLICA_STICKY_SECONDS, so they read their own changes.
+    The token is only used to pick the database here, routes still authorize on their own.
+    '''
+    Factory = Session
+    if replica_engine is not None:
+        token_data = decode_token(creds.credentials) if creds else None
+        if token_data is None or not await wrote_recently(token_data["user_id"]):
+            Factory = ReplicaSession
+    async with Factory() as session:
+        yield session
+
+
 class RoleChecker:
     '''
     Check if current user has enough permission for a certain operation.
@@ -79,7 +135,7 @@ class RoleChecker:
     def __init__(self, allowed_roles: list[str]) -> None:
         self.allowed_roles = allowed_roles
 
-    def __call__(self, current_user: User = Depends(get_current_user)) -> Any:
+    def __call__(self, current_user: Principal = Depends(get_current_principal)) -> Any:
         if not current_user.is_verified:
             raise AccountNotVerified()
         if current_user and current_user.role in self.allowed_roles:
@@ -14,6 +14,7 @@ from .dependencies import (
     RefreshTokenBearer,
     RoleChecker,
     get_current_user,
+    get_current_principal,
 )
 
 from src.utils.errors import (
@@ -101,7 +102,7 @@ async def logout(token_details: dict = Depends(AccessTokenBearer())):
     Logout user.
     '''
     jti = token_details["jti"]
-    await redis.add_jti_to_blocklist(jti)
+    await redis.add_jti_to_blocklist(jti, token_details["exp"])
     return {"message": "Logged Out successfully."}
 
 
@@ -125,7 +126,7 @@ async def update_user(
     payload: UserUpdate,
     session: AsyncSession = Depends(db.get_session),
     _ : bool = Depends(full_access),
-    current_user = Depends(get_current_user)
+    current_user = Depends(get_current_principal)
 ):
     '''
     Update user (only admin or current user can do it.)
@@ -182,7 +183,7 @@ async def reset_password(
     user_email = token_data.get('email')
     if user_email:
         user = await service.get_user_by_email(user_email, session)
-        _ = await service.update_user(user.id, {"password": Hash.bcrypt(passwords.new_password)}, session, None)
+        _ = await service.update_user(user.id, {"password": await Hash.bcrypt(passwords.new_password)}, session, None)
         return {"message": "Password reset successfully."}
 
     return JSONResponse(
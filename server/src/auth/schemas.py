@@ -46,6 +46,17 @@ class User(UserBase):
     created_at: datetime
 
 
+class Principal(BaseModel):
+    '''
+    What most endpoints need to know about the logged in user. Cached, so authorizing
+    a request does not need the users table (see get_current_principal).
+    '''
+    id: int
+    username: str
+    role: str
+    is_verified: bool
+
+
 class UserLogIn(UserValidatorMixin):
     username: str
     password: str | None = None
@@ -3,7 +3,8 @@ from sqlmodel import select
 from sqlmodel.ext.asyncio.session import AsyncSession
 
 from src.db.models import User
-from .schemas import UserCreate, UserLogIn, UserUpdate, PasswordResetRequest
+from src.db.redis import invalidate_user_credentials
+from .schemas import UserCreate, UserLogIn, UserUpdate, PasswordResetRequest, Principal
 from .utils import *
 from src.utils.config import Config
 from src.utils.errors import *
@@ -52,7 +53,7 @@ class UserService:
             raise UserAlreadyExists()
         user = User(**new_user)
         password = new_user["password"]
-        user.hashed_pass = Hash.bcrypt(password)
+        user.hashed_pass = await Hash.bcrypt(password)
         await self.send_verification_email(user)
         session.add(user)
         await session.commit()
@@ -63,8 +64,15 @@ class UserService:
         username = payload.username
         password = payload.password
         user = await self.get_user_by_name(username, session)
-        if not user or not Hash.verify(user.hashed_pass, password):
+        if not user:
             raise InvalidCredentials()
+        valid, new_hash = await Hash.verify_and_update(user.hashed_pass, password)
+        if not valid:
+            raise InvalidCredentials()
+        if new_hash is not None:
+            # Stored with an older bcrypt cost: upgrade it while we have the password.
+            user.hashed_pass = new_hash
+            await session.commit()
         token = create_token({"username": username, "role": user.role, "user_id": user.id}, expiry=timedelta(hours=Config.ACCESS_TOKEN_EXPIRY))
         refresh_token = create_token({"username": username, "role": user.role, "user_id": user.id}, expiry=timedelta(hours=Config.REFRESH_TOKEN_EXPIRY), refresh=True)
         return JSONResponse(
@@ -87,9 +95,10 @@ class UserService:
         user = await self.get_user(user_id, session)
         await session.delete(user)
         await session.commit()
+        await invalidate_user_credentials(user_id)
         return True
 
-    async def update_user(self, user_id: int, payload: UserUpdate, session: AsyncSession, current_user: User | None = None):
+    async def update_user(self, user_id: int, payload: UserUpdate, session: AsyncSession, current_user: Principal | None = None):
         '''
         For verification email, only change the is_verified to True.
         For resetting password, password will be in the payload
@@ -101,6 +110,7 @@ class UserService:
             if "password" in payload and payload["password"] is not None:
                 setattr(user, "hashed_pass", payload["password"])
             await session.commit()
+            await invalidate_user_credentials(user.id)
             await session.refresh(user)
             return user
 
@@ -115,12 +125,13 @@ class UserService:
                 setattr(user, key, value)
 
             if "password" in updated_data:
-                user.hashed_pass = Hash.bcrypt(updated_data["password"])
+                user.hashed_pass = await Hash.bcrypt(updated_data["password"])
 
             if "lichess_token" in updated_data and updated_data["lichess_token"] is not None and updated_data["lichess_token"] != '':
                 user.lichess_token = encrypt_lichess_token(updated_data["lichess_token"])
 
             await session.commit()
+            await invalidate_user_credentials(user.id)
             await session.refresh(user)
             return user
         else:
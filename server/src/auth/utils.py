@@ -1,4 +1,7 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
 from passlib.context import CryptContext
+from prometheus_client import Counter, Gauge
 import jwt
 from src.utils.config import Config
 from datetime import datetime, timedelta
@@ -11,15 +14,49 @@ import httpx
 
 
 from src.utils.errors import *
+from src.db.redis import credential_cache, lichess_token_key, user_auth_tag
+
+# Hashes made with a lower cost than BCRYPT_ROUNDS are flagged by needs_update / verify_and_update.
+pwd_cxt = CryptContext(schemes=["bcrypt"], bcrypt__rounds=Config.BCRYPT_ROUNDS)
+
+# The bcrypt backend releases the GIL while it hashes, so a few threads hash in parallel and the event
+# loop keeps serving requests (benchmarks/login_burst.py measures the loop lag during a login burst).
+hash_pool = ThreadPoolExecutor(max_workers=Config.HASH_WORKERS, thread_name_prefix="password-hash")
+HASH_QUEUE_DEPTH = Gauge("chessly_password_hash_queue_depth", "Password hashes running or waiting for a worker.")
+HASH_REJECTED = Counter("chessly_password_hash_rejected_total", "Password hashes rejected because the queue was full.")
+_pending_hashes = 0
+
+
+async def run_hashing(fn, *args):
+    '''
+    Runs a bcrypt call on the hashing pool.
+    Back-pressure: fails fast with PasswordHashingBusy (503) once HASH_QUEUE_LIMIT calls are pending.
+    '''
+    global _pending_hashes
+    if _pending_hashes >= Config.HASH_QUEUE_LIMIT:
+        HASH_REJECTED.inc()
+        raise PasswordHashingBusy()
+    _pending_hashes += 1
+    HASH_QUEUE_DEPTH.inc()
+    try:
+        return await asyncio.get_running_loop().run_in_executor(hash_pool, fn, *args)
+    finally:
+        _pending_hashes -= 1
+        HASH_QUEUE_DEPTH.dec()
 
-pwd_cxt = CryptContext(schemes=["bcrypt"])
 
 class Hash():
-    def bcrypt(password: str):
-        return pwd_cxt.hash(password)
+    async def bcrypt(password: str) -> str:
+        return await run_hashing(pwd_cxt.hash, password)
 
-    def verify(hashed_password, plain_password):
-        return pwd_cxt.verify(plain_password, hashed_password)
+    async def verify(hashed_password, plain_password) -> bool:
+        return await run_hashing(pwd_cxt.verify, plain_password, hashed_password)
+
+    async def verify_and_update(hashed_password, plain_password) -> tuple[bool, str | None]:
+        '''
+        Returns (valid, new hash). The new hash is set when the stored one uses an outdated cost.
+        '''
+        return await run_hashing(pwd_cxt.verify_and_update, plain_password, hashed_password)
 
 def create_token(data: dict, expiry: timedelta = None, refresh: bool = False):
     to_encode = data.copy()
@@ -86,6 +123,30 @@ def decrypt_lichess_token(encrypted_token: str) -> str:
         print("Fernet decryption error:", e)
         raise
 
+def cached_lichess_token(user_id: int, encrypted_token: str | None = None) -> str | None:
+    '''
+    Decrypted Lichess token from the in-memory credential cache.
+    When the encrypted token is known, the cached one is only returned if it was decrypted from it.
+    '''
+    cached = credential_cache.get(lichess_token_key(user_id))
+    if cached is None:
+        return None
+    ciphertext, token = cached
+    if encrypted_token is not None and encrypted_token != ciphertext:
+        return None
+    return token
+
+def get_user_lichess_token(user_id: int, encrypted_token: str, epoch: int) -> str:
+    '''
+    Decrypts (or takes from the cache) a user's Lichess token and caches it.
+    epoch is credential_cache.epoch() taken before the user row was read.
+    '''
+    token = cached_lichess_token(user_id, encrypted_token)
+    if token is None:
+        token = decrypt_lichess_token(encrypted_token)
+        credential_cache.set(lichess_token_key(user_id), (encrypted_token, token), user_auth_tag(user_id), epoch)
+    return token
+
 from src.db.models import Tournament
 async def discord_webhook(tournament: Tournament, winner_info: dict):
     '''
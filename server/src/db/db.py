@@ -1,21 +1,83 @@
-from sqlmodel import create_engine
-from sqlalchemy.orm import sessionmaker
-from sqlalchemy.ext.asyncio import AsyncEngine
+import time
+from prometheus_client import Counter, Gauge, Histogram
+from sqlalchemy import event
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine, async_sessionmaker
 from sqlmodel.ext.asyncio.session import AsyncSession
 from src.utils.config import Config
 
-async_engine = AsyncEngine(
-    create_engine(
-    url = Config.DATABASE_URL,
-    # echo = True
-))
+
+POOL_CHECKOUTS = Counter("chessly_db_pool_checkouts_total", "Connections handed out by the pool.", ["engine"])
+POOL_WAIT = Histogram(
+    "chessly_db_pool_wait_seconds",
+    "Time to get a connection from the pool (waiting for a free one or opening a new one).",
+    ["engine"],
+    buckets=(0.0005, 0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+)
+POOL_SIZE = Gauge("chessly_db_pool_size", "Configured pool size.", ["engine"])
+POOL_CHECKED_OUT = Gauge("chessly_db_pool_checked_out", "Connections currently in use.", ["engine"])
+POOL_CHECKED_IN = Gauge("chessly_db_pool_checked_in", "Idle connections in the pool.", ["engine"])
+POOL_OVERFLOW = Gauge("chessly_db_pool_overflow", "Connections open beyond pool_size (negative: pool not full yet).", ["engine"])
+
+
+class MeasuredPool(AsyncAdaptedQueuePool):
+    '''
+    Default async pool, timing how long every checkout waits.
+    '''
+    engine_name = "primary"
+
+    def recreate(self):
+        # The pool is rebuilt on dispose(), keep the label.
+        pool = super().recreate()
+        pool.engine_name = self.engine_name
+        return pool
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            POOL_WAIT.labels(self.engine_name).observe(time.perf_counter() - start)
+
+
+def make_engine(url: str, name: str) -> AsyncEngine:
+    engine = create_async_engine(
+        url,
+        poolclass=MeasuredPool,
+        pool_size=Config.DB_POOL_SIZE,
+        max_overflow=Config.DB_MAX_OVERFLOW,
+        pool_timeout=Config.DB_POOL_TIMEOUT,
+        pool_recycle=Config.DB_POOL_RECYCLE,
+        pool_pre_ping=Config.DB_POOL_PRE_PING,
+        connect_args={"prepared_statement_cache_size": Config.DB_STATEMENT_CACHE_SIZE},
+        # echo = True
+    )
+    engine.sync_engine.pool.engine_name = name
+
+    @event.listens_for(engine.sync_engine, "checkout")
+    def count_checkout(dbapi_connection, connection_record, connection_proxy):
+        POOL_CHECKOUTS.labels(name).inc()
+
+    # Read from the pool when /metrics is scraped.
+    POOL_SIZE.labels(name).set_function(lambda: engine.sync_engine.pool.size())
+    POOL_CHECKED_OUT.labels(name).set_function(lambda: engine.sync_engine.pool.checkedout())
+    POOL_CHECKED_IN.labels(name).set_function(lambda: engine.sync_engine.pool.checkedin())
+    POOL_OVERFLOW.labels(name).set_function(lambda: engine.sync_engine.pool.overflow())
+    return engine
+
+
+async_engine = make_engine(Config.DATABASE_URL, "primary")
+Session = async_sessionmaker(bind=async_engine, class_=AsyncSession, expire_on_commit=False)
+
+# Optional read replica. Without one, reads simply go to the primary.
+replica_engine = make_engine(Config.DATABASE_REPLICA_URL, "replica") if Config.DATABASE_REPLICA_URL else None
+ReplicaSession = async_sessionmaker(bind=replica_engine, class_=AsyncSession, expire_on_commit=False) if replica_engine else Session
+
 
 async def get_session():
     '''
     Returns database session.
     '''
-    Session = sessionmaker(
-        bind=async_engine, class_=AsyncSession, expire_on_commit=False
-    )
     async with Session() as session:
         yield session
+
@@ -0,0 +1,24 @@
+'''
+Named fetch plans.
+
+Relationships are lazy="raise": every query loads exactly what its endpoint needs, and
+touching anything else fails loudly instead of firing hidden queries. Pass a plan to
+.options(*PLAN). Auth (users) and standings only read columns, so they need no plan.
+'''
+from sqlalchemy.orm import raiseload, selectinload
+
+from .models import Tournament, Round
+
+# Tournament detail and snapshots: players, rounds and their matchups, one SELECT each.
+TOURNAMENT_DETAIL = (
+    selectinload(Tournament.players),
+    selectinload(Tournament.rounds).selectinload(Round.matchups),
+)
+
+# Tournament list pages render the tournament and its players only,
+# serialized by tournament_list_item: 2 SELECTs for a whole page. Rounds and matchups
+# stay unloaded, the detail endpoint serves them.
+TOURNAMENT_LIST = (
+    selectinload(Tournament.players),
+    raiseload(Tournament.rounds),
+)
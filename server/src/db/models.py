@@ -22,7 +22,7 @@ class User(SQLModel, table=True):
     created_at: datetime = Field(sa_column=Column(pg.TIMESTAMP, default=datetime.now))
 
     tournaments: list["Tournament"] = Relationship(
-        back_populates="manager", sa_relationship_kwargs={"lazy": "selectin"}, cascade_delete=True
+        back_populates="manager", sa_relationship_kwargs={"lazy": "raise"}, cascade_delete=True, passive_deletes=True
     )
     lichess_token: str | None = Field(default=None, exclude=True)
 
@@ -34,6 +34,13 @@ class User(SQLModel, table=True):
 class Tournament(SQLModel, table=True):
     __tablename__ = "tournaments"
 
+    # A manager's tournaments by status, ordered by start date (fetch_tournaments, counts).
+    # Listing pages: keyset on (start_date, id) within a manager and status, optionally filtered.
+    __table_args__ = (sa.Index('ix_tournaments_manager_status_start', 'manager_id', 'status', 'start_date', 'id'),
+                      sa.Index('ix_tournaments_manager_status_format_start', 'manager_id', 'status', 'format', 'start_date', 'id'),
+                      sa.Index('ix_tournaments_manager_status_time_control_start', 'manager_id', 'status', 'time_control', 'start_date', 'id'),
+                     )
+
     id: int | None = Field(default=None, primary_key=True)
     name: str = Field(unique=True, index=True)
     location: str
@@ -70,18 +77,18 @@ class Tournament(SQLModel, table=True):
         default=None, foreign_key="users.id", nullable=False, ondelete="CASCADE"
     )
     manager: User = Relationship(
-        back_populates="tournaments", sa_relationship_kwargs={"lazy": "selectin"}
+        back_populates="tournaments", sa_relationship_kwargs={"lazy": "raise"}
     )
 
     # ------------------ Player relationship -----------------
 
     players: list["Player"] = Relationship(
-        back_populates="tournament", sa_relationship_kwargs={"lazy": "selectin"}, cascade_delete=True
+        back_populates="tournament", sa_relationship_kwargs={"lazy": "raise"}, cascade_delete=True, passive_deletes=True
     )
 
     # ------------------ Round relationship -----------------
     rounds: list["Round"] = Relationship(
-        back_populates="tournament", sa_relationship_kwargs={"lazy": "selectin"}, cascade_delete=True
+        back_populates="tournament", sa_relationship_kwargs={"lazy": "raise"}, cascade_delete=True, passive_deletes=True
     )
 
     def __repr__(self) -> str:
@@ -92,6 +99,10 @@ class Player(SQLModel, table=True):
     __tablename__ = "players"
 
     __table_args__ = (UniqueConstraint('name', 'tournament_id', name='_name_tournament_id_uc_'),
+                      # Players of a tournament (loading, capacity count, duplicate name check).
+                      sa.Index('ix_players_tournament_name', 'tournament_id', 'name', postgresql_include=['rating']),
+                      # Player pages: keyset on (rating, id).
+                      sa.Index('ix_players_tournament_rating', 'tournament_id', 'rating', 'id'),
                      )
 
     id: int | None = Field(default=None, primary_key=True)
@@ -104,7 +115,7 @@ class Player(SQLModel, table=True):
         default=None, foreign_key="tournaments.id", nullable=False, ondelete="CASCADE"
     )
     tournament: Tournament = Relationship(
-        back_populates="players", sa_relationship_kwargs={"lazy": "selectin"}
+        back_populates="players", sa_relationship_kwargs={"lazy": "raise"}
     )
 
     # ------------- Matchup relationship
@@ -113,7 +124,9 @@ class Player(SQLModel, table=True):
         sa_relationship=sa.orm.relationship(
             "Matchup",
             foreign_keys="[Matchup.white_player_id]",
-            back_populates="white_player"
+            back_populates="white_player",
+            lazy="raise",
+            passive_deletes=True
         )
     )
     matchups_as_black: list["Matchup"] = Relationship(
@@ -121,7 +134,9 @@ class Player(SQLModel, table=True):
         sa_relationship=sa.orm.relationship(
             "Matchup",
             foreign_keys="[Matchup.black_player_id]",
-            back_populates="black_player"
+            back_populates="black_player",
+            lazy="raise",
+            passive_deletes=True
         )
     )
 
@@ -130,6 +145,9 @@ class Player(SQLModel, table=True):
 class Round(SQLModel, table=True):
     __tablename__ = "rounds"
 
+    __table_args__ = (sa.Index('ix_rounds_tournament_round', 'tournament_id', 'round_number'),
+                     )
+
     id: int | None = Field(default=None, primary_key=True)
     round_number: int
 
@@ -138,17 +156,27 @@ class Round(SQLModel, table=True):
         default=None, foreign_key="tournaments.id", nullable=False, ondelete="CASCADE"
     )
     tournament: Tournament = Relationship(
-        back_populates="rounds", sa_relationship_kwargs={"lazy": "selectin"}
+        back_populates="rounds", sa_relationship_kwargs={"lazy": "raise"}
     )
 
     # -------------- Matchup relationship
-    matchups: list["Matchup"] = Relationship(back_populates="round", sa_relationship_kwargs={"lazy": "selectin"}, cascade_delete=True)
+    matchups: list["Matchup"] = Relationship(back_populates="round", sa_relationship_kwargs={"lazy": "raise"}, cascade_delete=True, passive_deletes=True)
 
 
 
 class Matchup(SQLModel, table=True):
     __tablename__ = "matchups"
 
+    # Covering: the matchups of a round are read with an index only scan.
+    __table_args__ = (sa.Index(
+                        'ix_matchups_round_id', 'round_id',
+                        postgresql_include=['id', 'white_player_id', 'black_player_id', 'result']
+                      ),
+                      # ON DELETE CASCADE from players looks the matchups up by these.
+                      sa.Index('ix_matchups_white_player_id', 'white_player_id'),
+                      sa.Index('ix_matchups_black_player_id', 'black_player_id'),
+                     )
+
     id: int | None = Field(default=None, primary_key=True)
 
     result: Result = Field(
@@ -159,13 +187,15 @@ class Matchup(SQLModel, table=True):
             server_default=Result.NO_RESULT.value # ensures the db sets the default if not provided
         )
     )
+    # bumped on every result change, arbiters send it back to detect concurrent edits
+    version: int = Field(default=0, sa_column=Column(sa.Integer, nullable=False, server_default="0"))
 
     # -------------- Round relationship
     round_id: int | None = Field(
         default=None, foreign_key="rounds.id", nullable=False, ondelete="CASCADE"
     )
     round: Round = Relationship(
-        back_populates="matchups", sa_relationship_kwargs={"lazy": "selectin"}
+        back_populates="matchups", sa_relationship_kwargs={"lazy": "raise"}
     )
 
     # -------------- Player relationships
@@ -181,7 +211,8 @@ class Matchup(SQLModel, table=True):
         sa_relationship=sa.orm.relationship(
             "Player",
             foreign_keys="[Matchup.white_player_id]",
-            back_populates="matchups_as_white"
+            back_populates="matchups_as_white",
+            lazy="raise"
         )
     )
     black_player: Player = Relationship(
@@ -189,6 +220,62 @@ class Matchup(SQLModel, table=True):
         sa_relationship=sa.orm.relationship(
             "Player",
             foreign_keys="[Matchup.black_player_id]",
-            back_populates="matchups_as_black"
+            back_populates="matchups_as_black",
+            lazy="raise"
         )
-    )
\ No newline at end of file
+    )
+
+
+class SwissState(SQLModel, table=True):
+    '''
+    Running Swiss pairing state of a player. Updated when a round is paired and when results are saved,
+    so the next round never has to re-read and re-score the previous ones.
+    '''
+    __tablename__ = "swiss_states"
+
+    player_id: int = Field(primary_key=True, foreign_key="players.id", ondelete="CASCADE")
+    tournament_id: int = Field(foreign_key="tournaments.id", nullable=False, ondelete="CASCADE", index=True)
+    score: float = Field(default=0)
+    colors: str = Field(default="")
+    opponents: list[int] = Field(
+        default_factory=list,
+        sa_column=Column(pg.ARRAY(sa.Integer), nullable=False, server_default="{}")
+    )
+    had_bye: bool = Field(default=False)
+    last_float: int = Field(default=0)
+
+
+class Bracket(SQLModel, table=True):
+    '''
+    Elimination bracket of a tournament, stored as flat arrays (see src/tournament/bracket.py).
+    '''
+    __tablename__ = "brackets"
+
+    tournament_id: int = Field(primary_key=True, foreign_key="tournaments.id", ondelete="CASCADE")
+    size: int
+    double: bool = Field(default=False)
+    # two slots per match + the champion: player id, 0 = to be decided, -1 = bye
+    slots: list[int] = Field(default_factory=list, sa_column=Column(pg.ARRAY(sa.Integer), nullable=False))
+    # matchup id per match, 0 until both players are known
+    matchup_ids: list[int] = Field(default_factory=list, sa_column=Column(pg.ARRAY(sa.Integer), nullable=False))
+    # round id per tournament round
+    round_ids: list[int] = Field(default_factory=list, sa_column=Column(pg.ARRAY(sa.Integer), nullable=False))
+
+
+class Standing(SQLModel, table=True):
+    '''
+    Materialized standings row of a player, kept up to date when results are saved (see src/tournament/standings.py).
+    '''
+    __tablename__ = "standings"
+
+    player_id: int = Field(primary_key=True, foreign_key="players.id", ondelete="CASCADE")
+    tournament_id: int = Field(foreign_key="tournaments.id", nullable=False, ondelete="CASCADE", index=True)
+    points: float = Field(default=0)
+    wins: int = Field(default=0)
+    games_played: int = Field(default=0)
+    buchholz: float = Field(default=0)
+    sonneborn_berger: float = Field(default=0)
+    # one entry per game with a result
+    matchup_ids: list[int] = Field(default_factory=list, sa_column=Column(pg.ARRAY(sa.Integer), nullable=False, server_default="{}"))
+    opponent_ids: list[int] = Field(default_factory=list, sa_column=Column(pg.ARRAY(sa.Integer), nullable=False, server_default="{}"))
+    scores: list[float] = Field(default_factory=list, sa_column=Column(pg.ARRAY(sa.Float), nullable=False, server_default="{}"))
@@ -1,29 +1,401 @@
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+
 import redis.asyncio as redis
+from prometheus_client import Counter
 
 from src.utils.config import Config
 
-JTI_EXPIRY = 3600
-
 redis_client = redis.from_url(Config.REDIS_URL)
 
-async def add_jti_to_blocklist(jti: str) -> None:
+# Revoked JTIs, scored by the token's exp, so a worker can load all of them at once.
+REVOKED_JTIS_KEY = "auth:revoked_jtis"
+REVOCATION_CHANNEL = "auth:revoked"
+
+# Before REVOKED_JTIS_KEY, a revocation was only a plain "<jti>" key (empty value, expiring).
+# Set by the first worker that copied those keys into REVOKED_JTIS_KEY, see backfill_revoked_jtis().
+REVOKED_JTIS_BACKFILLED_KEY = "auth:revoked_jtis:backfilled"
+LEGACY_JTI_PATTERN = "????????-????-????-????-????????????"  # str(uuid4())
+
+
+class RevokedTokens:
+    '''
+    Local copy of the blocklist: {jti: exp}. Revoked tokens are few (logouts until their exp),
+    so the whole set fits in memory and a token that is not in it needs no Redis round trip.
+    Only trusted while subscribed to REVOCATION_CHANNEL (loaded on every (re)subscribe).
+    '''
+    PURGE_INTERVAL = 60
+
+    def __init__(self):
+        self.enabled = False
+        self._expiries: dict[str, float] = {}
+        self._next_purge = 0.0
+
+    def load(self, entries: list[tuple[bytes, float]]) -> None:
+        self._expiries = {jti.decode(): exp for jti, exp in entries}
+
+    def add(self, jti: str, exp: float) -> None:
+        self._expiries[jti] = exp
+
+    def __contains__(self, jti: str) -> bool:
+        now = time.time()
+        if now >= self._next_purge:
+            self._expiries = {k: exp for k, exp in self._expiries.items() if exp > now}
+            self._next_purge = now + self.PURGE_INTERVAL
+        exp = self._expiries.get(jti)
+        return exp is not None and exp > now
+
+
+revoked_tokens = RevokedTokens()
+
+
+async def add_jti_to_blocklist(jti: str, exp: int) -> None:
     '''
-    Adds token's JTI key in blocklist.
-    Adds jti as key and empty as value + the expiry date of the JTI.
+    Adds token's JTI key in blocklist until the token's own expiry (exp, unix seconds)
+    and tells every worker about it.
     '''
-    await redis_client.set(name=jti, value="", ex=JTI_EXPIRY)
+    now = time.time()
+    revoked_tokens.add(jti, exp)
+    async with redis_client.pipeline(transaction=True) as pipe:
+        pipe.set(name=jti, value="", ex=max(1, int(exp - now)))
+        pipe.zadd(REVOKED_JTIS_KEY, {jti: exp})
+        pipe.zremrangebyscore(REVOKED_JTIS_KEY, "-inf", now)
+        pipe.publish(REVOCATION_CHANNEL, f"{jti}:{exp}")
+        await pipe.execute()
 
 
 async def token_in_blocklist(jti: str) -> bool:
     '''
     Checks if token's JTI is in blocklist.
+    Answered locally while the revocation listener is subscribed, from Redis otherwise.
     '''
+    if revoked_tokens.enabled:
+        return jti in revoked_tokens
     jti = await redis_client.get(jti)
     return jti is not None # returns True or False
 
 
-async def invalidate_user_tournaments_cache(user_id: int, status="Not Started"):
-    pattern = f"user:{user_id}:tournaments:{status}"
-    keys = await redis_client.keys(pattern)
-    if keys:
-        await redis_client.delete(*keys)
\ No newline at end of file
+class LocalCache:
+    '''
+    Size-bounded LRU with a TTL, kept in each worker's memory in front of Redis.
+    Every entry has a tag (e.g. "tournament:5"). Evicting a tag drops all of its entries,
+    and every worker evicts together through the INVALIDATION_CHANNEL pub/sub messages.
+    Only used while this worker is subscribed, otherwise it could miss invalidations.
+    '''
+    def __init__(self, max_entries: int, ttl: float):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.enabled = False
+        self._entries: OrderedDict[str, tuple[float, str, object]] = OrderedDict()
+        self._tags: dict[str, set[str]] = {}
+        self._evictions = 0
+
+    def epoch(self) -> int:
+        '''
+        Take it before reading from Redis and pass it to set(), so a value read
+        before an eviction is not cached after it.
+        '''
+        return self._evictions
+
+    def get(self, key: str) -> object | None:
+        if not self.enabled:
+            return None
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires, _, value = entry
+        if expires < time.monotonic():
+            self._drop(key)
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    def set(self, key: str, value: object, tag: str, epoch: int) -> None:
+        if not self.enabled or epoch != self._evictions:
+            return
+        if key in self._entries:
+            self._drop(key)
+        self._entries[key] = (time.monotonic() + self.ttl, tag, value)
+        self._tags.setdefault(tag, set()).add(key)
+        while len(self._entries) > self.max_entries:
+            self._drop(next(iter(self._entries)))
+
+    def evict(self, tag: str) -> None:
+        self._evictions += 1
+        for key in self._tags.pop(tag, ()):
+            self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        self._evictions += 1
+        self._entries.clear()
+        self._tags.clear()
+
+    def _drop(self, key: str) -> None:
+        _, tag, _ = self._entries.pop(key)
+        keys = self._tags.get(tag)
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self._tags[tag]
+
+
+INVALIDATION_CHANNEL = "cache:invalidate"
+
+local_cache = LocalCache(max_entries=Config.LOCAL_CACHE_SIZE, ttl=Config.LOCAL_CACHE_TTL)
+# Decrypted credentials, kept apart so they have their own size and lifetime.
+credential_cache = LocalCache(max_entries=Config.CREDENTIAL_CACHE_SIZE, ttl=Config.CREDENTIAL_CACHE_TTL)
+LOCAL_CACHES = (local_cache, credential_cache)
+
+CACHE_REQUESTS = Counter(
+    "chessly_cache_requests_total",
+    "Cache lookups by cache, tier (local/redis) and result (hit/miss).",
+    ["cache", "tier", "result"]
+)
+
+
+async def backfill_revoked_jtis() -> int:
+    '''
+    Copies the revocations stored only as plain jti keys (written before REVOKED_JTIS_KEY existed)
+    into REVOKED_JTIS_KEY, with their remaining TTL as expiry. Done until one worker completes it
+    and sets REVOKED_JTIS_BACKFILLED_KEY (workers starting together may both copy, ZADD is idempotent).
+    Returns the number of jtis copied.
+    '''
+    if await redis_client.exists(REVOKED_JTIS_BACKFILLED_KEY):
+        return 0
+    copied = 0
+    batch = []
+
+    async def copy(keys: list[bytes]) -> int:
+        async with redis_client.pipeline(transaction=False) as pipe:
+            for key in keys:
+                pipe.get(key)
+                pipe.pttl(key)
+            replies = await pipe.execute()
+        now = time.time()
+        entries = {
+            key: now + ttl / 1000
+            for key, value, ttl in zip(keys, replies[::2], replies[1::2])
+            if value == b"" and ttl > 0
+        }
+        if entries:
+            await redis_client.zadd(REVOKED_JTIS_KEY, entries)
+        return len(entries)
+
+    async for key in redis_client.scan_iter(match=LEGACY_JTI_PATTERN, count=1000, _type="STRING"):
+        batch.append(key)
+        if len(batch) == 500:
+            copied += await copy(batch)
+            batch = []
+    if batch:
+        copied += await copy(batch)
+    await redis_client.set(REVOKED_JTIS_BACKFILLED_KEY, int(time.time()))
+    return copied
+
+
+def count_lookup(cache: str, tier: str, value) -> None:
+    CACHE_REQUESTS.labels(cache, tier, "miss" if value is None else "hit").inc()
+
+
+# Seconds before the listener subscribes again after an error, doubled on every failure in a row.
+LISTENER_RETRY_DELAY = 1
+LISTENER_MAX_RETRY_DELAY = 30
+
+
+async def listen_for_invalidations() -> None:
+    '''
+    Runs for the app lifetime: evicts local entries when any worker publishes an invalidation
+    and keeps the local blocklist in sync with revocations.
+    The local caches are switched off while not subscribed and emptied on every (re)subscribe.
+    '''
+    delay = LISTENER_RETRY_DELAY
+    while True:
+        pubsub = redis_client.pubsub()
+        try:
+            await pubsub.subscribe(INVALIDATION_CHANNEL, REVOCATION_CHANNEL)
+            # Subscribed before loading: revocations made meanwhile wait in the subscription.
+            await backfill_revoked_jtis()
+            await redis_client.zremrangebyscore(REVOKED_JTIS_KEY, "-inf", time.time())
+            revoked_tokens.load(await redis_client.zrange(REVOKED_JTIS_KEY, 0, -1, withscores=True))
+            revoked_tokens.enabled = True
+            for cache in LOCAL_CACHES:
+                cache.clear()
+                cache.enabled = True
+            delay = LISTENER_RETRY_DELAY
+            async for message in pubsub.listen():
+                if message["type"] != "message":
+                    continue
+                try:
+                    data = message["data"].decode()
+                    if message["channel"] == REVOCATION_CHANNEL.encode():
+                        jti, exp = data.rsplit(":", 1)
+                        revoked_tokens.add(jti, float(exp))
+                    else:
+                        for cache in LOCAL_CACHES:
+                            cache.evict(data)
+                except (UnicodeDecodeError, ValueError):
+                    # A malformed message is skipped, the subscription (and the local caches) stay up.
+                    logging.error("Skipped malformed message on %r: %r", message["channel"], message["data"])
+        except asyncio.CancelledError:
+            raise
+        except redis.RedisError as e:
+            logging.error("Invalidation listener lost Redis, resubscribing in %ss: %s", delay, e)
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, LISTENER_MAX_RETRY_DELAY)
+        except Exception as e:
+            # Anything else must not end the task for good: the local caches would stay off until a restart.
+            logging.exception(e)
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, LISTENER_MAX_RETRY_DELAY)
+        finally:
+            revoked_tokens.enabled = False
+            for cache in LOCAL_CACHES:
+                cache.enabled = False
+            await pubsub.aclose()
+
+
+TOURNAMENTS_CACHE_EXPIRY = 3600
+
+# Every user's tournament lists share one generation counter. Invalidating is a single INCR:
+# all lists (every status) cached under the old generation become unreachable and expire on their own.
+def user_tournaments_generation_key(user_id: int) -> str:
+    return f"user:{user_id}:tournaments:gen"
+
+def user_tournaments_key(user_id: int, generation: int, variant: str) -> str:
+    return f"user:{user_id}:tournaments:{generation}:{variant}"
+
+def user_tournaments_tag(user_id: int) -> str:
+    return f"user:{user_id}:tournaments"
+
+# Reads the generation and the list cached under it in one round trip.
+_read_user_tournaments = redis_client.register_script("""
+local generation = redis.call('GET', KEYS[1]) or '0'
+return {generation, redis.call('GET', ARGV[1] .. generation .. ':' .. ARGV[2])}
+""")
+
+
+async def get_user_tournaments_cache(user_id: int, variant: str) -> tuple[int | None, bytes | None]:
+    '''
+    Returns (generation, cached list or None). Generation is None on a local hit.
+    Store a freshly loaded list with the generation returned here, so a list loaded
+    before an invalidation can never be cached under the newer generation.
+    '''
+    tag = user_tournaments_tag(user_id)
+    local_key = f"{tag}:{variant}"
+    cached = local_cache.get(local_key)
+    count_lookup("tournaments", "local", cached)
+    if cached is not None:
+        return None, cached
+
+    epoch = local_cache.epoch()
+    generation, cached = await _read_user_tournaments(
+        keys=[user_tournaments_generation_key(user_id)],
+        args=[f"user:{user_id}:tournaments:", variant]
+    )
+    count_lookup("tournaments", "redis", cached)
+    if cached is not None:
+        local_cache.set(local_key, cached, tag, epoch)
+    return int(generation), cached
+
+
+async def set_user_tournaments_cache(user_id: int, generation: int, variant: str, data: bytes) -> None:
+    await redis_client.set(user_tournaments_key(user_id, generation, variant), data, ex=TOURNAMENTS_CACHE_EXPIRY)
+
+
+async def invalidate_user_tournaments_cache(user_id: int) -> None:
+    '''
+    Drops every cached tournament list of the user (all statuses) with one O(1) command,
+    and tells every worker to drop its local copies. Call it after the change is committed.
+    '''
+    tag = user_tournaments_tag(user_id)
+    local_cache.evict(tag)
+    async with redis_client.pipeline(transaction=True) as pipe:
+        pipe.incr(user_tournaments_generation_key(user_id))
+        pipe.publish(INVALIDATION_CHANNEL, tag)
+        if Config.DATABASE_REPLICA_URL:
+            # Every tournament/player write goes through here: keep the user's reads on the primary.
+            pipe.set(recent_write_key(user_id), 1, ex=Config.REPLICA_STICKY_SECONDS)
+        await pipe.execute()
+
+
+def recent_write_key(user_id: int) -> str:
+    return f"user:{user_id}:recent_write"
+
+
+async def wrote_recently(user_id: int) -> bool:
+    '''
+    True for REPLICA_STICKY_SECONDS after the user changed a tournament or player.
+    '''
+    return await redis_client.exists(recent_write_key(user_id)) > 0
+
+
+SNAPSHOT_EXPIRY = 3600
+
+def tournament_version_key(tournament_id: int) -> str:
+    return f"tournament:{tournament_id}:version"
+
+def tournament_snapshot_key(tournament_id: int, version: int) -> str:
+    return f"tournament:{tournament_id}:snapshot:{version}"
+
+def tournament_tag(tournament_id: int) -> str:
+    return f"tournament:{tournament_id}"
+
+
+async def bump_tournament_version(tournament_id: int) -> int:
+    '''
+    Marks a tournament as changed. Call it after the change is committed,
+    so a snapshot stored under the new version can never hold older data.
+    '''
+    tag = tournament_tag(tournament_id)
+    local_cache.evict(tag)
+    async with redis_client.pipeline(transaction=True) as pipe:
+        pipe.incr(tournament_version_key(tournament_id))
+        pipe.publish(INVALIDATION_CHANNEL, tag)
+        version, _ = await pipe.execute()
+    return version
+
+
+async def get_tournament_snapshot(tournament_id: int) -> tuple[int | None, bytes | None]:
+    '''
+    Returns (current version, serialized tournament or None if not cached for that version).
+    Version is None on a local hit.
+    '''
+    tag = tournament_tag(tournament_id)
+    snapshot = local_cache.get(tag)
+    count_lookup("snapshot", "local", snapshot)
+    if snapshot is not None:
+        return None, snapshot
+
+    epoch = local_cache.epoch()
+    version = int(await redis_client.get(tournament_version_key(tournament_id)) or 0)
+    snapshot = await redis_client.get(tournament_snapshot_key(tournament_id, version))
+    count_lookup("snapshot", "redis", snapshot)
+    if snapshot is not None:
+        local_cache.set(tag, snapshot, tag, epoch)
+    return version, snapshot
+
+
+async def set_tournament_snapshot(tournament_id: int, version: int, snapshot: bytes) -> None:
+    await redis_client.set(tournament_snapshot_key(tournament_id, version), snapshot, ex=SNAPSHOT_EXPIRY)
+
+
+# Everything cached about a user's credentials (principal, decrypted Lichess token) shares one tag.
+def user_auth_tag(user_id: int) -> str:
+    return f"user:{user_id}:auth"
+
+def principal_key(user_id: int) -> str:
+    return f"user:{user_id}:principal"
+
+def lichess_token_key(user_id: int) -> str:
+    return f"user:{user_id}:lichess_token"
+
+
+async def invalidate_user_credentials(user_id: int) -> None:
+    '''
+    Drops the cached principal and decrypted Lichess token of a user on every worker.
+    Call it after the change (role, verification, token, deletion, ...) is committed.
+    '''
+    tag = user_auth_tag(user_id)
+    credential_cache.evict(tag)
+    await redis_client.publish(INVALIDATION_CHANNEL, tag)
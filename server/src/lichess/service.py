@@ -1,13 +1,59 @@
-from sqlmodel import select
-from sqlmodel.ext.asyncio.session import AsyncSession
+import httpx
 
-from src.db.models import Player, Tournament
-from src.utils.errors import *
+from src.utils.config import Config
 
-from src.utils.errors import (
-    PlayerNotFound,
-    PlayerAlreadyExists
-)
 
-class LichessService:
-    pass
\ No newline at end of file
+class LichessClient:
+    '''
+    One pooled HTTP client to lichess.org for the whole app lifetime.
+    Opened and closed by the app lifespan, so every proxied call reuses warm
+    (keep-alive, HTTP/2 multiplexed) connections instead of a new TCP + TLS handshake.
+    '''
+    def __init__(self):
+        self._client: httpx.AsyncClient | None = None
+
+    def open(self, base_url: str = Config.LICHESS_URL) -> None:
+        if self._client is not None:
+            return
+        self._client = httpx.AsyncClient(
+            base_url=base_url,
+            http2=Config.LICHESS_HTTP2,
+            limits=httpx.Limits(
+                max_connections=Config.LICHESS_MAX_CONNECTIONS,
+                max_keepalive_connections=Config.LICHESS_MAX_KEEPALIVE,
+                keepalive_expiry=Config.LICHESS_KEEPALIVE_EXPIRY,
+            ),
+            timeout=httpx.Timeout(Config.LICHESS_TIMEOUT, connect=Config.LICHESS_CONNECT_TIMEOUT),
+        )
+
+    async def close(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        if self._client is None:
+            # Used outside the app lifespan (scripts, celery): open lazily.
+            self.open()
+        return self._client
+
+    @staticmethod
+    def _headers(token: str, headers: dict | None = None) -> dict:
+        return {"Authorization": f"Bearer {token}", **(headers or {})}
+
+    async def get(self, path: str, token: str, **kwargs) -> httpx.Response:
+        return await self.client.get(path, headers=self._headers(token), **kwargs)
+
+    async def post(self, path: str, token: str, **kwargs) -> httpx.Response:
+        return await self.client.post(path, headers=self._headers(token), **kwargs)
+
+    def stream(self, method: str, path: str, token: str, headers: dict | None = None, **kwargs):
+        '''
+        Long lived streams (game events) have no read timeout.
+        '''
+        timeout = httpx.Timeout(Config.LICHESS_TIMEOUT, connect=Config.LICHESS_CONNECT_TIMEOUT, read=None)
+        return self.client.stream(method, path, headers=self._headers(token, headers), timeout=timeout, **kwargs)
+
+
+lichess_client = LichessClient()
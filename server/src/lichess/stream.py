@@ -0,0 +1,146 @@
+'''
+Fan-out hub for Lichess board game streams.
+
+Every (user, game) has at most one upstream connection, however many tabs follow it.
+Upstream NDJSON lines are turned into SSE events once and pushed to every subscriber
+through a bounded queue. The upstream connection is closed when the last subscriber leaves.
+'''
+import asyncio
+from contextlib import asynccontextmanager
+from typing import AsyncIterator
+
+import httpx
+import orjson
+
+from src.utils.streaming import split_lines
+
+from .service import LichessClient, lichess_client
+
+# Events buffered per subscriber. A subscriber that falls further behind loses its oldest
+# events, except the opening gameFull and the latest gameState (see GameStream.make_room).
+QUEUE_SIZE = 64
+
+# Marks the end of the stream in a subscriber queue.
+END = None
+
+
+def sse_event(line: bytes) -> bytes:
+    return b"data: " + line + b"\n\n"
+
+
+def sse_error(message: str, details: str | None = None) -> bytes:
+    payload = {"error": message}
+    if details is not None:
+        payload["details"] = details
+    return sse_event(orjson.dumps(payload))
+
+
+class GameStream:
+    def __init__(self):
+        self.subscribers: set[asyncio.Queue] = set()
+        self.task: asyncio.Task | None = None
+        # Replayed to late subscribers: the opening gameFull and the latest gameState.
+        self.game_full: bytes | None = None
+        self.game_state: bytes | None = None
+
+    def publish(self, event: bytes | None) -> None:
+        for queue in self.subscribers:
+            if queue.full():
+                self.make_room(queue)
+            queue.put_nowait(event)
+
+    def make_room(self, queue: asyncio.Queue) -> None:
+        '''
+        Drops the oldest event of a full queue, but never the gameFull (the client needs it to
+        draw the board, and it is not sent again) nor the latest gameState. An overflowed subscriber
+        resynchronises from that gameState: it carries the full move list and clocks, so the
+        moves of the dropped gameStates are in it. Chat lines and older states are what gets lost.
+        The queue is full, so nobody is waiting on get(): it can be drained and refilled.
+        '''
+        events = [queue.get_nowait() for _ in range(queue.qsize())]
+        kept = (self.game_full, self.game_state)
+        oldest = next((i for i, e in enumerate(events) if not any(e is k for k in kept)), 0)
+        del events[oldest]
+        for e in events:
+            queue.put_nowait(e)
+
+    def remember(self, line: bytes, event: bytes) -> None:
+        if self.game_full is None:
+            self.game_full = event
+            return
+        try:
+            kind = orjson.loads(line).get("type")
+        except (orjson.JSONDecodeError, AttributeError):
+            return
+        if kind == "gameState":
+            self.game_state = event
+
+
+class StreamHub:
+    def __init__(self, client: LichessClient):
+        self.client = client
+        self._streams: dict[tuple[int, str], GameStream] = {}
+
+    @asynccontextmanager
+    async def subscribe(self, user_id: int, game_id: str, token: str) -> AsyncIterator[asyncio.Queue]:
+        '''
+        Yields a queue of SSE events (bytes). END (None) means the stream is over.
+        '''
+        key = (user_id, game_id)
+        stream = self._streams.get(key)
+        if stream is None:
+            stream = self._streams[key] = GameStream()
+            stream.task = asyncio.create_task(self._pump(key, stream, game_id, token))
+
+        queue = asyncio.Queue(maxsize=QUEUE_SIZE)
+        for event in (stream.game_full, stream.game_state):
+            if event is not None:
+                queue.put_nowait(event)
+        stream.subscribers.add(queue)
+        try:
+            yield queue
+        finally:
+            stream.subscribers.discard(queue)
+            if not stream.subscribers and self._streams.get(key) is stream:
+                del self._streams[key]
+                stream.task.cancel()
+
+    async def _pump(self, key: tuple[int, str], stream: GameStream, game_id: str, token: str) -> None:
+        # https://lichess.org/api#tag/Board/operation/boardGameStream
+        url = f"/api/board/game/stream/{game_id}"
+        headers = {"Accept": "application/x-ndjson"}
+        try:
+            async with self.client.stream("GET", url, token, headers=headers, follow_redirects=True) as response:
+                if response.status_code != 200:
+                    details = (await response.aread()).decode(errors="replace")
+                    stream.publish(sse_error(f"Failed to connect to Lichess stream: {response.status_code}", details))
+                    return
+
+                buffer = bytearray()
+                async for chunk in response.aiter_bytes():
+                    for line in split_lines(buffer, chunk):
+                        line = line.strip()
+                        if not line:  # keep-alive
+                            continue
+                        event = sse_event(line)
+                        stream.remember(line, event)
+                        stream.publish(event)
+        except httpx.TimeoutException:
+            stream.publish(sse_error("Lichess stream connection timed out."))
+        except httpx.RequestError as exc:
+            stream.publish(sse_error(f"HTTP request error for Lichess stream: {exc}"))
+        except Exception as exc:
+            stream.publish(sse_error(f"An unexpected error occurred in stream: {type(exc).__name__}", str(exc)))
+        finally:
+            if self._streams.get(key) is stream:
+                del self._streams[key]
+            stream.publish(END)
+
+    async def close(self) -> None:
+        streams, self._streams = list(self._streams.values()), {}
+        for stream in streams:
+            stream.task.cancel()
+        await asyncio.gather(*(stream.task for stream in streams), return_exceptions=True)
+
+
+stream_hub = StreamHub(lichess_client)
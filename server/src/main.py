@@ -1,10 +1,26 @@
+import asyncio
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from .utils.errors import register_all_errors
 from .utils.middleware import register_middleware
 from .utils import config
-from src import auth, tournament, player, lichess
+from .db.redis import listen_for_invalidations
+from .lichess.service import lichess_client
+from .lichess.stream import stream_hub
+from src import auth, tournament, player, lichess, metrics, transfer
 
-app = FastAPI(**config.app_config)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    invalidations = asyncio.create_task(listen_for_invalidations())
+    lichess_client.open()
+    yield
+    await stream_hub.close()
+    await lichess_client.close()
+    invalidations.cancel()
+
+
+app = FastAPI(**config.app_config, lifespan=lifespan)
 
 register_all_errors(app)
 register_middleware(app)
@@ -12,4 +28,6 @@ register_middleware(app)
 app.include_router(auth.AuthRouter)
 app.include_router(tournament.TournamentRouter)
 app.include_router(player.PlayerRouter)
-app.include_router(lichess.LichessRouter)
\ No newline at end of file
+app.include_router(lichess.LichessRouter)
+app.include_router(transfer.TransferRouter)
+app.include_router(metrics.MetricsRouter)
\ No newline at end of file
@@ -0,0 +1 @@
+from .routes import router as MetricsRouter
\ No newline at end of file
@@ -0,0 +1,17 @@
+from fastapi import APIRouter, Response
+from prometheus_client import generate_latest, CONTENT_TYPE_LATEST
+from src.utils.config import version
+
+
+router = APIRouter(
+    prefix=f"/api/{version}/metrics",
+    tags=["metrics"]
+)
+
+
+@router.get('')
+async def get_metrics():
+    '''
+    Prometheus metrics of this worker (cache hits and misses per tier, ...).
+    '''
+    return Response(content=generate_latest(), media_type=CONTENT_TYPE_LATEST)
@@ -1,15 +1,17 @@
-from fastapi import status, APIRouter, Depends
+from fastapi import status, APIRouter, Depends, Query, Response
+from src.utils.pagination import NEXT_CURSOR_HEADER
 from .schemas import *
 from src.utils.config import version
 from .service import PlayerService
 from sqlmodel.ext.asyncio.session import AsyncSession
 from src.db import db
-from src.db.models import User
+from src.auth.schemas import Principal
 from src.db.redis import *
 
 from src.auth.dependencies import (
     RoleChecker,
-    get_current_user
+    get_current_principal,
+    get_read_session
 )
 
 
@@ -28,65 +30,101 @@ async def create_player(
     payload: PlayerCreate,
     _ : bool = Depends(full_access),
     session: AsyncSession = Depends(db.get_session),
-    user: User = Depends(get_current_user)
+    user: Principal = Depends(get_current_principal)
 ) -> dict:
     '''
     Create new player.
     '''
-    await invalidate_user_tournaments_cache(user.id)
     player = await service.create_player(tournament_id, payload, session)
+    await bump_tournament_version(tournament_id)
+    await invalidate_user_tournaments_cache(user.id)
     return player
 
 
+@router.post('/{tournament_id}/bulk', status_code=status.HTTP_201_CREATED, response_model=PlayerBulkResult)
+async def create_players(
+    tournament_id: int,
+    payload: PlayerBulkCreate,
+    _ : bool = Depends(full_access),
+    session: AsyncSession = Depends(db.get_session),
+    user: Principal = Depends(get_current_principal)
+) -> dict:
+    '''
+    Register many players at once (e.g. a whole field) in one insert.
+    Names already in the tournament are skipped and listed under duplicates.
+    '''
+    result = await service.create_players(tournament_id, payload, session)
+    if result["created"]:
+        await bump_tournament_version(tournament_id)
+        await invalidate_user_tournaments_cache(user.id)
+    return result
+
+
 @router.patch('/{id}', status_code=status.HTTP_200_OK, response_model=Player)
 async def update_player(
   id: int,
   payload: PlayerUpdate,
   _: bool = Depends(full_access),
   session: AsyncSession = Depends(db.get_session),
-  user: User = Depends(get_current_user)
+  user: Principal = Depends(get_current_principal)
 ) -> dict:
     '''
     Update a player.
     '''
-    await invalidate_user_tournaments_cache(user.id)
     player = await service.update_player(id, payload, session)
+    await bump_tournament_version(player.tournament_id)
+    await invalidate_user_tournaments_cache(user.id)
     return player
 
 
 @router.get('/{tournament_id}', status_code=status.HTTP_200_OK, response_model=list[Player])
 async def get_players(
     tournament_id: int,
-    session: AsyncSession = Depends(db.get_session)
+    response: Response,
+    limit: int | None = Query(None, ge=1, le=500),
+    sort: str = "desc",
+    cursor: str | None = None,
+    session: AsyncSession = Depends(get_read_session)
 ) -> list[dict]:
     '''
-    Get all players for a certain tournament
+    Get all players for a certain tournament.
+    With a limit, returns one page sorted by rating instead. The cursor of the next page
+    is in the X-Next-Cursor header (absent on the last page), pass it back as ?cursor=.
     '''
-    players = await service.get_players(tournament_id, session)
+    if limit is None:
+        return await service.get_players(tournament_id, session)
+    players, next_cursor = await service.get_players_page(tournament_id, limit, sort, cursor, session)
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
     return players
 
 
-@router.delete('/{id}', status_code=status.HTTP_204_NO_CONTENT)
+@router.delete('/{id}', status_code=status.HTTP_200_OK, response_model=PlayersDeleted)
 async def delete_player(
     id: int,
     session: AsyncSession = Depends(db.get_session),
-    user: User = Depends(get_current_user)
+    user: Principal = Depends(get_current_principal)
 ):
     """
-    Delete player be ID.
+    Delete player be ID. Returns the number of deleted rows.
     """
+    deleted = await service.delete_player(id, session)
+    await bump_tournament_version(deleted["tournament_id"])
     await invalidate_user_tournaments_cache(user.id)
-    await service.delete_player(id, session)
+    return deleted
 
 
-@router.delete('/tournament/{tournament_id}', status_code=status.HTTP_204_NO_CONTENT)
+@router.delete('/tournament/{tournament_id}', status_code=status.HTTP_200_OK, response_model=PlayersDeleted)
 async def delete_all_players(
     tournament_id: int,
     session: AsyncSession = Depends(db.get_session),
-    user: User = Depends(get_current_user)
+    user: Principal = Depends(get_current_principal)
 ):
     '''
-    Delete all players in a tournament.
+    Delete all players in a tournament. Returns the number of deleted rows.
     '''
-    await invalidate_user_tournaments_cache(user.id)
-    await service.delete_players(tournament_id, session)
\ No newline at end of file
+    deleted = await service.delete_players(tournament_id, session)
+    if deleted["players"]:
+        await bump_tournament_version(tournament_id)
+        await invalidate_user_tournaments_cache(user.id)
+    return deleted
\ No newline at end of file
@@ -1,4 +1,4 @@
-from pydantic import BaseModel, Field, field_validator
+from pydantic import BaseModel, Field, field_validator, model_validator
 
 
 class PlayerValidatorMixin(BaseModel):
@@ -37,4 +37,24 @@ class PlayerUpdate(PlayerValidatorMixin):
 
 
 class Player(PlayerBase):
-    id: int
\ No newline at end of file
+    id: int
+
+
+class PlayerBulkCreate(BaseModel):
+    players: list[PlayerCreate] = Field(min_length=1, max_length=64)
+
+    @model_validator(mode="after")
+    def unique_names(self):
+        if len({p.name for p in self.players}) != len(self.players):
+            raise ValueError("Player names must be unique.")
+        return self
+
+
+class PlayerBulkResult(BaseModel):
+    created: list[Player]
+    duplicates: list[str] # names already registered in the tournament, skipped
+
+
+class PlayersDeleted(BaseModel):
+    players: int
+    matchups: int # removed with the players
@@ -1,9 +1,12 @@
 from sqlmodel import select
+from sqlalchemy import Integer, String, column, delete, exists, func, literal, true, values
+from sqlalchemy.dialects.postgresql import insert
 from sqlmodel.ext.asyncio.session import AsyncSession
 
-from src.db.models import Player, Tournament
+from src.db.models import Player, Tournament, Round, Matchup
 from src.utils.errors import *
-from .schemas import PlayerCreate, PlayerUpdate
+from .schemas import PlayerCreate, PlayerUpdate, PlayerBulkCreate
+from src.utils.pagination import decode_cursor, keyset, page
 
 from src.utils.errors import (
     PlayerNotFound,
@@ -22,7 +25,29 @@ class PlayerService:
         result = await session.exec(statement)
         return result.all()
 
+    async def get_players_page(self, tournament_id: int, limit: int, sort: str, cursor: str | None, session: AsyncSession):
+        '''
+        One page of a tournament's players ordered by (rating, id).
+        Returns (players, cursor of the next page or None).
+        '''
+        statement = select(Player).where(Player.tournament_id == tournament_id)
+        after = decode_cursor(cursor, int, int) if cursor else None
+        statement = keyset(statement, (Player.rating, Player.id), after, sort == "desc", limit)
+        result = await session.exec(statement)
+        return page(result.all(), limit, lambda p: (p.rating, p.id))
+
     async def create_player(self, tournament_id: int, payload: PlayerCreate, session: AsyncSession):
+        '''
+        Locks the tournament row first, like create_players, so two registrations cannot both
+        pass the capacity check for the last seat.
+        '''
+        result = await session.exec(
+            select(Tournament.nb_of_players).where(Tournament.id == tournament_id).with_for_update()
+        )
+        capacity = result.first()
+        if capacity is None:
+            raise TournamentNotFound()
+
         statement = select(Player).where(
             (Player.name == payload.name) &
             (Player.tournament_id == tournament_id)
@@ -32,14 +57,9 @@ class PlayerService:
         if player:
             raise PlayerAlreadyExists()
 
-        tournament = await session.get(Tournament, tournament_id)
-        if tournament is None:
-            raise TournamentNotFound()
-
-        count_stmt = select(Player).where(Player.tournament_id == tournament_id)
+        count_stmt = select(func.count()).select_from(Player).where(Player.tournament_id == tournament_id)
         count_result = await session.exec(count_stmt)
-        current_players = count_result.all()
-        if len(current_players) >= tournament.nb_of_players:
+        if count_result.one() >= capacity:
             raise TournamentFull()
 
         new_player = Player.model_validate(payload)
@@ -49,6 +69,58 @@ class PlayerService:
         await session.refresh(new_player)
         return new_player
 
+    async def create_players(self, tournament_id: int, payload: PlayerBulkCreate, session: AsyncSession) -> dict:
+        '''
+        Registers many players with one INSERT ... SELECT ... ON CONFLICT DO NOTHING.
+        The tournament row is locked first, so the capacity check (one COUNT inside the insert)
+        cannot race another registration. All or nothing on capacity: raises TournamentFull
+        if the new players do not all fit. Names already registered are skipped and reported.
+        '''
+        result = await session.exec(
+            select(Tournament.nb_of_players).where(Tournament.id == tournament_id).with_for_update()
+        )
+        capacity = result.first()
+        if capacity is None:
+            raise TournamentNotFound()
+
+        submitted = select(
+            values(column("name", String), column("rating", Integer), name="submitted_values")
+            .data([(p.name, p.rating) for p in payload.players])
+        ).cte("submitted")
+        fresh = select(submitted.c.name, submitted.c.rating).where(
+            ~exists().where((Player.tournament_id == tournament_id) & (Player.name == submitted.c.name))
+        ).cte("fresh")
+        counts = select(
+            select(func.count()).select_from(Player).where(Player.tournament_id == tournament_id).scalar_subquery().label("taken"),
+            select(func.count()).select_from(fresh).scalar_subquery().label("fresh"),
+        ).cte("counts")
+        inserted = (
+            insert(Player)
+            .from_select(
+                ["name", "rating", "tournament_id"],
+                select(fresh.c.name, fresh.c.rating, literal(tournament_id, Integer))
+                .where(counts.c.taken + counts.c.fresh <= capacity)
+            )
+            .on_conflict_do_nothing(constraint="_name_tournament_id_uc_")
+            .returning(Player.id, Player.name, Player.rating)
+            .cte("inserted")
+        )
+        statement = select(
+            counts.c.fresh, inserted.c.id, inserted.c.name, inserted.c.rating
+        ).select_from(counts.outerjoin(inserted, true()))
+        result = await session.exec(statement)
+        rows = result.all()
+
+        nb_fresh = rows[0].fresh
+        created = [{"id": r.id, "name": r.name, "rating": r.rating} for r in rows if r.id is not None]
+        if nb_fresh and not created:
+            await session.rollback()
+            raise TournamentFull()
+        await session.commit()
+
+        names = {p["name"] for p in created}
+        return {"created": created, "duplicates": [p.name for p in payload.players if p.name not in names]}
+
     async def update_player(self, id: int, payload: PlayerUpdate, session: AsyncSession):
         player = await self.get_player(id, session)
         player.sqlmodel_update(payload.model_dump(exclude_unset=True))
@@ -59,14 +131,35 @@ class PlayerService:
         return player
 
 
-    async def delete_player(self, id: int, session: AsyncSession):
-        tournament = await self.get_player(id, session)
-        await session.delete(tournament)
+    async def delete_player(self, id: int, session: AsyncSession) -> dict:
+        '''
+        One DELETE, the player's matchups, standings and Swiss state go with the ON DELETE CASCADE foreign keys.
+        The cascaded matchups are counted in the same statement (it sees the rows as they were before).
+        Returns {"tournament_id", "players", "matchups"}.
+        '''
+        deleted = delete(Player).where(Player.id == id).returning(Player.tournament_id).cte("deleted")
+        matchups = select(func.count()).select_from(Matchup).where(
+            (Matchup.white_player_id == id) | (Matchup.black_player_id == id)
+        ).scalar_subquery()
+        result = await session.exec(select(deleted.c.tournament_id, matchups.label("matchups")))
+        row = result.first()
+        if row is None:
+            raise PlayerNotFound()
         await session.commit()
+        return {"tournament_id": row.tournament_id, "players": 1, "matchups": row.matchups}
 
-    async def delete_players(self, tournament_id: int, session: AsyncSession):
-        players = await session.exec(select(Player).where(Player.tournament_id == tournament_id))
-        for player in players:
-            await session.delete(player)
+    async def delete_players(self, tournament_id: int, session: AsyncSession) -> dict:
+        '''
+        Deletes every player of the tournament with one statement, whatever their number.
+        Returns {"players", "matchups"}.
+        '''
+        deleted = delete(Player).where(Player.tournament_id == tournament_id).returning(Player.id).cte("deleted")
+        statement = select(
+            select(func.count()).select_from(deleted).scalar_subquery().label("players"),
+            select(func.count()).select_from(Matchup).join(Round, Round.id == Matchup.round_id)
+                .where(Round.tournament_id == tournament_id).scalar_subquery().label("matchups"),
+        )
+        result = await session.exec(statement)
+        row = result.one()
         await session.commit()
-        return
+        return {"players": row.players, "matchups": row.matchups}
@@ -0,0 +1,174 @@
+'''
+Single- and double-elimination bracket engine.
+
+A bracket is a flat int array of slots, two per match (slot 2*m is white, 2*m+1 is black),
+plus one extra slot at the end for the champion. A slot holds a player id, TBD or BYE.
+The shape of the bracket (which slot a winner or loser moves to) only depends on the
+bracket size, so it lives in a cached template and never has to be stored.
+
+Matches are numbered round by round: winners bracket first, then the losers bracket,
+then the grand final. The grand final is a single game (no bracket reset).
+'''
+from dataclasses import dataclass
+from functools import lru_cache
+
+TBD = 0
+BYE = -1
+
+WINNERS = "winners"
+LOSERS = "losers"
+FINAL = "final"
+
+
+@dataclass(frozen=True, slots=True)
+class BracketNode:
+    section: str
+    round: int  # tournament round number the match is played in
+    winner_to: int  # slot the winner moves to
+    loser_to: int  # slot the loser moves to, -1 when eliminated
+
+
+def bracket_size(nb_of_players: int) -> int:
+    '''
+    Smallest power of two that fits every player (at least 2).
+    '''
+    return max(2, 1 << (nb_of_players - 1).bit_length())
+
+
+def nb_of_rounds(size: int, double: bool) -> int:
+    k = size.bit_length() - 1
+    return 2 * k if double else k
+
+
+@lru_cache(maxsize=None)
+def seed_positions(size: int) -> tuple[int, ...]:
+    '''
+    Standard seeding: seed 1 and 2 can only meet in the final, byes go to the top seeds.
+    Returns the seed number (1 based) of every leaf, left to right.
+    '''
+    order = [1]
+    while len(order) < size:
+        total = 2 * len(order) + 1
+        order = [s for seed in order for s in (seed, total - seed)]
+    return tuple(order)
+
+
+@lru_cache(maxsize=None)
+def bracket_template(size: int, double: bool) -> tuple[BracketNode, ...]:
+    k = size.bit_length() - 1
+
+    wb_start = []
+    index = 0
+    for r in range(1, k + 1):
+        wb_start.append(index)
+        index += size >> r
+
+    lb_start, lb_count = [], []
+    if double:
+        for j in range(1, 2 * k - 1):
+            lb_start.append(index)
+            lb_count.append(size >> ((j + 1) // 2 + 1))
+            index += lb_count[-1]
+        final = index
+        index += 1
+    nb_of_matches = index
+    champion = 2 * nb_of_matches
+
+    nodes = []
+    for r in range(1, k + 1):
+        for i in range(size >> r):
+            if r < k:
+                winner_to = 2 * (wb_start[r] + i // 2) + i % 2
+            else:
+                winner_to = 2 * final if double else champion
+
+            if not double:
+                loser_to = -1
+            elif r == 1 and k == 1:
+                loser_to = 2 * final + 1
+            elif r == 1:
+                loser_to = 2 * (lb_start[0] + i // 2) + i % 2
+            else:
+                # Losers dropping from the winners bracket are crossed over to delay rematches.
+                j = 2 * (r - 1)
+                target = i if r % 2 == 0 else lb_count[j - 1] - 1 - i
+                loser_to = 2 * (lb_start[j - 1] + target) + 1
+
+            rnd = r if not double or r == 1 else 2 * r - 2
+            nodes.append(BracketNode(WINNERS, rnd, winner_to, loser_to))
+
+    for j in range(1, len(lb_start) + 1):
+        for i in range(lb_count[j - 1]):
+            if j == len(lb_start):
+                winner_to = 2 * final + 1
+            elif j % 2 == 1:
+                winner_to = 2 * (lb_start[j] + i)
+            else:
+                winner_to = 2 * (lb_start[j] + i // 2) + i % 2
+            nodes.append(BracketNode(LOSERS, j + 1, winner_to, -1))
+
+    if double:
+        nodes.append(BracketNode(FINAL, 2 * k, champion, -1))
+    return tuple(nodes)
+
+
+def _move(slots: list[int], nodes: tuple[BracketNode, ...], match: int, winner: int, loser: int, touched: set[int]) -> None:
+    node = nodes[match]
+    _place(slots, nodes, node.winner_to, winner, touched)
+    if node.loser_to != -1:
+        _place(slots, nodes, node.loser_to, loser, touched)
+
+
+def _place(slots: list[int], nodes: tuple[BracketNode, ...], slot: int, value: int, touched: set[int]) -> None:
+    '''
+    Puts a value in a slot and resolves byes downstream. Only the branch below the slot is visited.
+    '''
+    if slots[slot] == value:
+        return
+    slots[slot] = value
+    match = slot // 2
+    if match == len(nodes):  # champion slot
+        return
+    touched.add(match)
+
+    white, black = slots[2 * match], slots[2 * match + 1]
+    if BYE in (white, black):
+        other = black if white == BYE else white
+        _move(slots, nodes, match, other, BYE, touched)
+    else:
+        # Real (or still incomplete) match: nothing moves on until it has a result.
+        _move(slots, nodes, match, TBD, TBD, touched)
+
+
+def new_bracket(player_ids: list[int], double: bool) -> tuple[list[int], set[int]]:
+    '''
+    Builds the slots for players ordered by seed (best first).
+    Returns (slots, touched matches).
+    '''
+    size = bracket_size(len(player_ids))
+    nodes = bracket_template(size, double)
+    slots = [TBD] * (2 * len(nodes) + 1)
+    touched = set()
+    for leaf, seed in enumerate(seed_positions(size)):
+        value = player_ids[seed - 1] if seed <= len(player_ids) else BYE
+        _place(slots, nodes, leaf, value, touched)
+    return slots, touched
+
+
+def record_result(slots: list[int], nodes: tuple[BracketNode, ...], match: int, winner_side: int | None) -> set[int]:
+    '''
+    Advances the winner (0 = white, 1 = black) and drops the loser of a match.
+    winner_side None takes a previous result back (no result or a draw still to be decided).
+    Returns the matches whose slots changed.
+    '''
+    touched = set()
+    if winner_side is None:
+        _move(slots, nodes, match, TBD, TBD, touched)
+    else:
+        winner, loser = slots[2 * match + winner_side], slots[2 * match + 1 - winner_side]
+        _move(slots, nodes, match, winner, loser, touched)
+    return touched
+
+
+def is_ready(slots: list[int], match: int) -> bool:
+    return slots[2 * match] > 0 and slots[2 * match + 1] > 0
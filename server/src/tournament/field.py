@@ -0,0 +1,56 @@
+'''
+Synthetic player fields, for generate_players, load tests and the benchmark fixtures.
+A seed makes a field reproducible: the same seed always gives the same ratings.
+'''
+import random
+
+from src.utils.enums import RatingDistribution
+
+# Rating bounds accepted by the player schemas.
+MIN_RATING = 400
+MAX_RATING = 4000
+
+
+def synthetic_ratings(
+    count: int,
+    distribution: RatingDistribution = RatingDistribution.UNIFORM,
+    mean: int = 1500,
+    deviation: int = 350,
+    seed: int | None = None
+) -> list[int]:
+    '''
+    Uniform over [MIN_RATING, MAX_RATING], or normal(mean, deviation) clamped to it.
+    '''
+    rng = random.Random(seed)
+    if distribution == RatingDistribution.UNIFORM:
+        return [rng.randint(MIN_RATING, MAX_RATING) for _ in range(count)]
+    return [min(MAX_RATING, max(MIN_RATING, round(rng.gauss(mean, deviation)))) for _ in range(count)]
+
+
+def synthetic_names(count: int, taken: set[str] = frozenset(), prefix: str = "Player#") -> list[str]:
+    '''
+    prefix1, prefix2, ... skipping the names already taken.
+    '''
+    names = []
+    number = 0
+    while len(names) < count:
+        number += 1
+        name = f"{prefix}{number}"
+        if name not in taken:
+            names.append(name)
+    return names
+
+
+def synthetic_field(
+    count: int,
+    taken: set[str] = frozenset(),
+    distribution: RatingDistribution = RatingDistribution.UNIFORM,
+    mean: int = 1500,
+    deviation: int = 350,
+    seed: int | None = None,
+    prefix: str = "Player#"
+) -> list[tuple[str, int]]:
+    '''
+    Returns [(name, rating), ...] for count new players.
+    '''
+    return list(zip(synthetic_names(count, taken, prefix), synthetic_ratings(count, distribution, mean, deviation, seed)))
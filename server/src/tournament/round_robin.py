@@ -0,0 +1,71 @@
+'''
+Round-robin schedules from Berger tables.
+
+A schedule only depends on the number of players, so the table of seat numbers (0 based
+pairing numbers) is built once per size and cached. Scheduling actual players is then an
+index mapping from seats to player ids.
+
+Berger tables (FIDE): round 1 pairs seat i with seat n-1-i, every next round adds n/2 to
+each seat modulo n-1, and the last seat alternates colours. With an odd number of players
+the last seat is a dummy: whoever meets it has a bye.
+'''
+from functools import lru_cache
+
+# nb_of_players_check caps a tournament at 64 players.
+MAX_PLAYERS = 64
+
+Pairings = list[list[tuple[int | None, int | None]]]
+
+
+def table_size(nb_of_players: int) -> int:
+    '''
+    Seats in the table: the number of players, plus a dummy seat when it is odd.
+    '''
+    return nb_of_players + nb_of_players % 2
+
+
+@lru_cache(maxsize=None)
+def berger_table(size: int) -> tuple[tuple[tuple[int, int], ...], ...]:
+    '''
+    Rounds of (white seat, black seat) for an even number of seats.
+    '''
+    if size % 2 or not 2 <= size <= table_size(MAX_PLAYERS):
+        raise ValueError(f"Invalid Berger table size: {size}")
+    last = size - 1
+    half = size // 2
+    boards = [(i, last - i) for i in range(half)]
+    rounds = []
+    for r in range(last):
+        rounds.append(tuple(boards))
+        # the last seat stays and changes colour, the others move half a table on
+        boards = [
+            (white if white == last else (white + half) % last, black if black == last else (black + half) % last)
+            for white, black in boards
+        ]
+        white, black = boards[0]
+        boards[0] = (black, white)
+    return tuple(rounds)
+
+
+def seed_by_rating(players: list[tuple[int, int]]) -> list[int]:
+    '''
+    Player ids ordered by pairing number: (id, rating) sorted by rating, best first (ties by id).
+    '''
+    return [player_id for player_id, _ in sorted(players, key=lambda p: (-p[1], p[0]))]
+
+
+def round_robin_pairings(player_ids: list[int], double_round_robin: bool = False) -> Pairings:
+    '''
+    Pairings of every round for players ordered by pairing number.
+    Byes are pairings with a None side. A double round robin repeats the schedule with colours swapped.
+    '''
+    if len(player_ids) > MAX_PLAYERS:
+        raise ValueError(f"A round robin cannot have more than {MAX_PLAYERS} players.")
+    if len(player_ids) < 2:
+        return []
+    table = berger_table(table_size(len(player_ids)))
+    seats = list(player_ids) + [None] * (table_size(len(player_ids)) - len(player_ids))
+    rounds = [[(seats[white], seats[black]) for white, black in boards] for boards in table]
+    if double_round_robin:
+        rounds += [[(black, white) for white, black in pairings] for pairings in rounds]
+    return rounds
@@ -1,19 +1,24 @@
-from fastapi import status, APIRouter, Depends
+from fastapi import status, APIRouter, Depends, Query
+from datetime import date
+from fastapi.responses import Response
 from .schemas import *
 from src.utils.config import version
-from .service import TournamentService, get_full_tournament_data
+from .service import TournamentService, dump_tournament, dump_tournaments
 from sqlmodel.ext.asyncio.session import AsyncSession
 from src.db import db
-from src.db.models import User
+from src.auth.schemas import Principal
 from src.db.redis import *
 from src.auth.utils import discord_webhook
-import json
+from src.utils.errors import TournamentNotFound
+from src.utils.enums import TimeControl, Format, RatingDistribution
+from src.utils.pagination import NEXT_CURSOR_HEADER
 
 
 from src.auth.dependencies import (
     AccessTokenBearer,
     RoleChecker,
-    get_current_user
+    get_current_principal,
+    get_read_session
 )
 
 router = APIRouter(
@@ -27,81 +32,101 @@ full_access = RoleChecker(['admin', 'user'])
 admin_access = RoleChecker(['admin'])
 
 
+async def snapshot_response(tournament, status_code: int = status.HTTP_200_OK) -> Response:
+    '''
+    Called after a change: serializes the tournament once, stores it as the snapshot
+    of the new version and returns the same bytes.
+    '''
+    version = await bump_tournament_version(tournament.id)
+    snapshot = dump_tournament(tournament)
+    await set_tournament_snapshot(tournament.id, version, snapshot)
+    return Response(content=snapshot, media_type="application/json", status_code=status_code)
+
+
+def page_response(data: bytes, next_cursor: str | None) -> Response:
+    headers = {NEXT_CURSOR_HEADER: next_cursor} if next_cursor else None
+    return Response(content=data, media_type="application/json", headers=headers)
+
+
 @router.post('/', status_code=status.HTTP_201_CREATED, response_model=Tournament)
 async def create_tournament(
     payload: TournamentCreate,
-    user: User = Depends(get_current_user),
+    user: Principal = Depends(get_current_principal),
     _ : bool = Depends(full_access),
     session: AsyncSession = Depends(db.get_session)
 ) -> dict:
     '''
     Create new tournament.
     '''
-    await invalidate_user_tournaments_cache(user.id)
     tournament = await service.create_tournament(payload, user.id, session)
-    payload = {"content": f"Tournament {tournament.name} has ended. Winner is...."}
-    return tournament
+    await invalidate_user_tournaments_cache(user.id)
+    return await snapshot_response(tournament, status.HTTP_201_CREATED)
 
 
 @router.put('/{id}', status_code=status.HTTP_200_OK, response_model=Tournament)
 async def update_tournament(
     id: int,
     payload: TournamentUpdate,
-    user: User = Depends(get_current_user),
+    user: Principal = Depends(get_current_principal),
     _ : bool = Depends(full_access),
     session: AsyncSession = Depends(db.get_session)
 ) -> dict:
     '''
     Update a tournament.
     '''
-    await invalidate_user_tournaments_cache(user.id)
     tournament = await service.update_tournament(id, payload, user, session)
-    return tournament
+    await invalidate_user_tournaments_cache(user.id)
+    return await snapshot_response(tournament)
 
 
-# e.g: {{ _.url }}/?limit=5&sort=avsc
+# e.g: {{ _.url }}/?status=Ongoing&limit=5&sort=asc&format=Swiss&date_from=2025-01-01
 @router.get('/', response_model=list[Tournament], status_code=status.HTTP_200_OK)
 async def fetch_tournaments(
     status: str,
-    limit: int = 10,
+    limit: int = Query(10, ge=1, le=100),
     sort: str = "desc",
+    cursor: str | None = None,
+    time_control: TimeControl | None = None,
+    format: Format | None = None,
+    date_from: date | None = None,
+    date_to: date | None = None,
     token_details: dict = Depends(acccess_token_bearer),
-    session: AsyncSession = Depends(db.get_session)
+    session: AsyncSession = Depends(get_read_session)
 ) -> list[Tournament]:
     """
-    Retrieves all tournaments with the given status, for the current user. (up to the limit + sorted for start date)
+    Retrieves one page of the tournaments with the given status, for the current user, sorted by start date.
+    Optional filters: time control, format, start date range.
+    Tournaments come with their players but no rounds, GET /tournament/{id} has the rounds.
+    The cursor of the next page is in the X-Next-Cursor header (absent on the last page), pass it back as ?cursor=.
     """
     user_id = int(token_details["user_id"]) # get current user id from token
-    cache_key = f"user:{user_id}:tournaments:{status}"
+    filters = [time_control.value if time_control else "", format.value if format else "", date_from or "", date_to or ""]
+    variant = ":".join(str(part) for part in [status, limit, sort, cursor or "", *filters])
 
-    # Try from redis cache
-    cached = await redis_client.get(cache_key) # this returns a list of byte objects
-    if cached is not None and len(cached) != 0:
+    # Try from redis cache. The cached value is the serialized page (next cursor + response), it is sent as is.
+    generation, cached = await get_user_tournaments_cache(user_id, variant)
+    if cached:
     # if False: #? manually disable caching.
-        cached_string = cached.decode("utf-8") # decode the bytes object to a uft-8 string
-        tournaments_data = json.loads(cached_string) # list of dict
-        if tournaments_data:
-            tournaments = [Tournament.model_validate(t) for t in tournaments_data]
-            return tournaments
+        next_cursor, _, data = cached.partition(b"\n")
+        return page_response(data, next_cursor.decode())
 
     # not cached, get them from db
-    tournaments = await service.get_all_tournaments(user_id, limit, sort, status, session)
+    tournaments, next_cursor = await service.get_all_tournaments(
+        user_id, limit, sort, status, session, cursor, time_control, format, date_from, date_to
+    )
+    data = dump_tournaments(tournaments)
 
     # cache results for future requests
     if tournaments:
-        await invalidate_user_tournaments_cache(user_id) #! remove any old data if it exists for consistency
-        await redis_client.set(
-            cache_key,
-            json.dumps([get_full_tournament_data(t) for t in tournaments]),
-            ex=3600)
+        await set_user_tournaments_cache(user_id, generation, variant, (next_cursor or "").encode() + b"\n" + data)
 
-    return tournaments
+    return page_response(data, next_cursor)
 
 
 @router.get('/counts', status_code=status.HTTP_200_OK)
 async def tournament_counts(
     token_details: dict = Depends(acccess_token_bearer),
-    session: AsyncSession = Depends(db.get_session)
+    session: AsyncSession = Depends(get_read_session)
 ):
     """
     Retrieves the total number of tournaments for current user.
@@ -116,6 +141,34 @@ async def tournament_counts(
     return nb
 
 
+@router.get('/dashboard', response_model=dict[str, DashboardSection], status_code=status.HTTP_200_OK)
+async def tournament_dashboard(
+    limit: int = Query(10, ge=1, le=100),
+    token_details: dict = Depends(acccess_token_bearer),
+    session: AsyncSession = Depends(get_read_session)
+):
+    """
+    Everything the home view needs in one request: for every status, the number of tournaments
+    and the first page of them (newest first). next_cursor continues with /tournament/?status=...&cursor=...
+    e.g:
+    {
+	"Ongoing": {"count": 5, "tournaments": [...], "next_cursor": "..."},
+	"Finished": {"count": 2, "tournaments": [...], "next_cursor": null},
+	...
+    }
+    Cached as one unit, invalidated together with the tournament lists.
+    """
+    user_id = int(token_details["user_id"])
+    variant = f"dashboard:{limit}"
+    generation, cached = await get_user_tournaments_cache(user_id, variant)
+    if cached:
+        return Response(content=cached, media_type="application/json")
+
+    data = await service.get_dashboard(user_id, limit, session)
+    await set_user_tournaments_cache(user_id, generation, variant, data)
+    return Response(content=data, media_type="application/json")
+
+
 @router.get('/{id}', response_model=Tournament, status_code=status.HTTP_200_OK)
 async def get_tournament(
     id: int,
@@ -123,23 +176,57 @@ async def get_tournament(
 ) -> list[Tournament]:
     """
     Retrieves tournament be ID.
+    Served from the snapshot of the current version, the database is only hit once per change.
+    Misses are built from the primary, never the replica: a lagging replica could otherwise
+    store older data under the new version, for every reader, until the snapshot expires.
+    """
+    version, snapshot = await get_tournament_snapshot(id)
+    if snapshot is None:
+        tournament = await service.get_tournament(id, session)
+        if tournament is None:
+            raise TournamentNotFound()
+        snapshot = dump_tournament(tournament)
+        await set_tournament_snapshot(id, version, snapshot)
+    return Response(content=snapshot, media_type="application/json")
+
+
+@router.get('/{id}/bracket', response_model=BracketRead, status_code=status.HTTP_200_OK)
+async def get_bracket(
+    id: int,
+    session: AsyncSession = Depends(get_read_session)
+):
+    """
+    Retrieves the live bracket of an elimination tournament.
     """
-    tournament = await service.get_tournament(id, session)
-    return tournament
+    bracket = await service.get_bracket(id, session)
+    return bracket
 
 
-@router.delete('/{id}', status_code=status.HTTP_204_NO_CONTENT)
+@router.get('/{id}/standings', response_model=list[StandingRead], status_code=status.HTTP_200_OK)
+async def get_standings(
+    id: int,
+    session: AsyncSession = Depends(db.get_session)
+):
+    """
+    Retrieves the ranked standings: points, head-to-head, Sonneborn-Berger, Buchholz and wins.
+    """
+    table = await service.get_standings(id, session)
+    return table
+
+
+@router.delete('/{id}', status_code=status.HTTP_200_OK, response_model=TournamentDeleted)
 async def delete_tournament(
     id: int,
-    status: str,
     session: AsyncSession = Depends(db.get_session),
-    user: User = Depends(get_current_user)
+    user: Principal = Depends(get_current_principal)
 ):
     """
-    Delete tournament be ID.
+    Delete tournament be ID. Returns the number of deleted rows per table.
     """
-    await invalidate_user_tournaments_cache(user.id, status)
-    await service.delete_tournament(id, session)
+    deleted = await service.delete_tournament(id, session)
+    await invalidate_user_tournaments_cache(user.id)
+    await bump_tournament_version(id)
+    return deleted
 
 
 @router.post('/{id}/start', response_model=Tournament, status_code=status.HTTP_200_OK)
@@ -147,15 +234,29 @@ async def start_tournament(
     id: int,
     _ : bool = Depends(full_access),
     session: AsyncSession = Depends(db.get_session),
-    user: User = Depends(get_current_user)
+    user: Principal = Depends(get_current_principal)
 ):
     """
     Start tournament: set status to Ongoing and generate all round pairings.
     """
-    await invalidate_user_tournaments_cache(user.id)
-    await invalidate_user_tournaments_cache(user.id, status="Ongoing") # invalidate also ongoing because this just became one
     tournament = await service.start_tournament(id, session)
-    return tournament
+    await invalidate_user_tournaments_cache(user.id)
+    return await snapshot_response(tournament)
+
+
+@router.post('/{id}/next_round', response_model=Tournament, status_code=status.HTTP_200_OK)
+async def next_round(
+    id: int,
+    _ : bool = Depends(full_access),
+    session: AsyncSession = Depends(db.get_session),
+    user: Principal = Depends(get_current_principal)
+):
+    """
+    Swiss only: pair the next round from the current standings, once the current round has all results.
+    """
+    tournament = await service.next_round(id, session)
+    await invalidate_user_tournaments_cache(user.id)
+    return await snapshot_response(tournament)
 
 
 @router.put('/{id}/end', response_model=Tournament, status_code=status.HTTP_200_OK)
@@ -163,47 +264,56 @@ async def end_tournament(
     id: int,
     _ : bool = Depends(full_access),
     session: AsyncSession = Depends(db.get_session),
-    user: User = Depends(get_current_user)
+    user: Principal = Depends(get_current_principal)
 ):
     """
     End tournament: set status to Finished.
     """
-    await invalidate_user_tournaments_cache(user.id, status="Ongoing")
-    await invalidate_user_tournaments_cache(user.id, status="Finished") # invalidate also finished because this just became one
     tournament = await service.end_tournament(id, session)
-    winner_info = await service.get_tournament_winner(tournament)
-    await discord_webhook(tournament, winner_info)
-    return tournament
+    await invalidate_user_tournaments_cache(user.id)
+    winner_info = await service.get_tournament_winner(tournament, session)
+    if winner_info:
+        await discord_webhook(tournament, winner_info)
+    return await snapshot_response(tournament)
 
 
-@router.put('/{id}/round_result/{round_number}', response_model=Tournament, status_code=status.HTTP_200_OK)
+@router.put('/{id}/round_result/{round_number}', response_model=RoundResultDelta, status_code=status.HTTP_200_OK)
 async def save_round_results(
     id: int,
     round_number: int,
     payload: RoundResult,
     _ : bool = Depends(full_access),
     session: AsyncSession = Depends(db.get_session),
-    user: User = Depends(get_current_user)
+    user: Principal = Depends(get_current_principal)
 ):
     '''
     Update the results of a certain round.
+    Send every matchup's version back to get a 409 instead of overwriting a concurrent change.
+    Returns only the matchups whose result changed, the snapshot is rebuilt on the next read.
     '''
-    await invalidate_user_tournaments_cache(user.id, status="Ongoing")
-    tournament = await service.update_results(id, round_number, payload, session)
-    return tournament
+    delta = await service.update_results(id, round_number, payload, session)
+    if delta["matchups"]:
+        await invalidate_user_tournaments_cache(user.id)
+        await bump_tournament_version(id)
+    return delta
 
 
 @router.post('/{id}/generate_players', response_model=Tournament, status_code=status.HTTP_200_OK)
 async def generate_players(
     id: int,
+    distribution: RatingDistribution = RatingDistribution.UNIFORM,
+    mean: int = Query(1500, ge=400, le=4000),
+    deviation: int = Query(350, ge=0, le=2000),
+    seed: int | None = None,
     _ : bool = Depends(full_access),
     session: AsyncSession = Depends(db.get_session),
-    user: User = Depends(get_current_user)
+    user: Principal = Depends(get_current_principal)
 ):
     """
-    Generate all players for a given tournament.
-    Random names with random ratings.
+    Generate the missing players of a given tournament.
+    Ratings are uniform, or normal around mean. The same seed always gives the same field.
+    e.g: {{ _.url }}/5/generate_players?distribution=normal&mean=1800&seed=42
     """
+    tournament = await service.generate_players(id, session, distribution, mean, deviation, seed)
     await invalidate_user_tournaments_cache(user.id)
-    tournament = await service.generate_players(id, session)
-    return tournament
+    return await snapshot_response(tournament)
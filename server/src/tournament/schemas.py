@@ -13,6 +13,7 @@ class MatchupRead(BaseModel):
     white_player: PlayerRead
     black_player: PlayerRead
     result: str | None = None
+    version: int = 0
 
 class RoundRead(BaseModel):
     id: int
@@ -21,6 +22,36 @@ class RoundRead(BaseModel):
     matchups: list[MatchupRead] | None = None
 
 
+class BracketMatchRead(BaseModel):
+    match: int
+    section: str
+    round_number: int
+    white_player_id: int | None = None
+    black_player_id: int | None = None
+    bye: bool = False
+    matchup_id: int | None = None
+    result: str | None = None
+
+class BracketRead(BaseModel):
+    tournament_id: int
+    double: bool
+    size: int
+    champion_id: int | None = None
+    players: list[PlayerRead]
+    matches: list[BracketMatchRead]
+
+
+class StandingRead(BaseModel):
+    rank: int
+    player: PlayerRead
+    points: float
+    head_to_head: float
+    sonneborn_berger: float
+    buchholz: float
+    wins: int
+    games_played: int
+
+
 class TournamentValidatorMixin(BaseModel):
     @field_validator("name", check_fields=False)
     def name_length(cls, v):
@@ -96,10 +127,35 @@ class Tournament(TournamentBase):
     rounds: list[RoundRead] | None = None
 
 
+class DashboardSection(BaseModel):
+    count: int
+    tournaments: list[Tournament]
+    next_cursor: str | None = None
+
+
+class TournamentDeleted(BaseModel):
+    tournaments: int
+    players: int
+    rounds: int
+    matchups: int
+
+
 class Result(BaseModel):
     matchupId: int
     result: Result
+    version: int | None = None # version the result was loaded with, None skips the conflict check
 
 
 class RoundResult(BaseModel):
-    results: list[Result]
\ No newline at end of file
+    results: list[Result]
+
+
+class MatchupDelta(BaseModel):
+    id: int
+    result: str
+    version: int
+
+class RoundResultDelta(BaseModel):
+    tournament_id: int
+    round_number: int
+    matchups: list[MatchupDelta]
\ No newline at end of file
@@ -0,0 +1,16 @@
+from src.utils.enums import Result
+
+# Score table: win=1, draw=0.5, loss=0. Values are (white points, black points).
+RESULT_POINTS = {
+    Result.NO_RESULT: (0, 0),
+    Result.WHITE_WINS: (1, 0),
+    Result.BLACK_WINS: (0, 1),
+    Result.DRAW: (0.5, 0.5),
+}
+
+# Points awarded for a bye (Swiss rounds with an odd number of players).
+BYE_POINTS = 1
+
+
+def result_points(result: Result | None) -> tuple[float, float]:
+    return RESULT_POINTS.get(result, (0, 0))
@@ -1,120 +1,142 @@
 from sqlmodel import desc, select, asc
 from sqlmodel.ext.asyncio.session import AsyncSession
-from sqlalchemy.orm import selectinload
-from sqlalchemy import func
+from sqlalchemy import func, insert, update, delete, exists, or_, true, literal_column
+from sqlalchemy.dialects.postgresql import JSON, aggregate_order_by
 
-from src.db.models import Tournament, User, Round, Matchup, Player
+from src.db.models import Tournament, User, Round, Matchup, Player, SwissState, Bracket, Standing
+from src.db.fetch_plans import TOURNAMENT_DETAIL, TOURNAMENT_LIST
 from .schemas import TournamentCreate, TournamentUpdate, RoundResult
-from src.utils.enums import Status, Format, Result
-import random
+from .writer import write_pairings, write_results
+from .swiss import Entrant, pair_round, record_pairings
+from .scoring import result_points, BYE_POINTS
+from . import standings
+from .field import synthetic_field
+from .round_robin import round_robin_pairings, seed_by_rating
+from .bracket import (
+    BYE,
+    bracket_size,
+    bracket_template,
+    nb_of_rounds,
+    new_bracket,
+    record_result,
+    is_ready
+)
+from src.utils.enums import Status, Format, Result, TimeControl, RatingDistribution
+from src.utils.pagination import decode_cursor, encode_cursor, keyset, page
+from datetime import date
+import orjson
 
 from src.utils.errors import (
     TournamentNotFound,
     TournamentAlreadyExists,
     InsufficientPermission,
     TournamentStarted,
-    TournamentNotFinished
+    TournamentNotFinished,
+    RoundNotFinished,
+    InvalidTournamentFormat,
+    ResultLocked,
+    ResultConflict,
+    BracketNotFound
 )
 
-from src.player.schemas import PlayerCreate
-from src.player.service import PlayerService
-player_service = PlayerService()
-
-
-def get_full_tournament_data(t: Tournament):
-    data = t.model_dump(mode="json")
-    # Players
-    data["players"] = [p.model_dump(mode="json") for p in getattr(t, "players", [])]
-    # Build a lookup for players by ID
-    player_lookup = {p.id: p for p in getattr(t, "players", [])}
-    # Rounds with nested matchups and full player info
-    data["rounds"] = []
-    for r in getattr(t, "rounds", []):
-        round_data = r.model_dump(mode="json")
-        round_data["matchups"] = []
-        for m in getattr(r, "matchups", []):
-            matchup_data = m.model_dump(mode="json")
-            # Replace player IDs with full player dicts
-            white_player_obj = getattr(m, "white_player", None)
-            black_player_obj = getattr(m, "black_player", None)
-            # If these are IDs, look them up
-            if isinstance(white_player_obj, int):
-                white_player_obj = player_lookup.get(white_player_obj)
-            if isinstance(black_player_obj, int):
-                black_player_obj = player_lookup.get(black_player_obj)
-            matchup_data["white_player"] = white_player_obj.model_dump(mode="json") if white_player_obj else None
-            matchup_data["black_player"] = black_player_obj.model_dump(mode="json") if black_player_obj else None
-            round_data["matchups"].append(matchup_data)
-        data["rounds"].append(round_data)
-    return data
-
-
-def berger_table_pairings(player_ids, double_round_robin=False):
-    n_players = len(player_ids)
-    rounds = []
-    # Add dummy for bye if odd
-    if n_players % 2 != 0:
-        player_ids = player_ids + [None]
-
-    n = len(player_ids)
-    num_rounds = n - 1  # Always n-1 rounds after dummy is added
-
-    rotation = player_ids[:-1]
-    fixed = player_ids[-1]
-
-    for round_num in range(num_rounds):
-        pairings = []
-        # Pair fixed with rotating player
-        if round_num % 2 == 0:
-            pairings.append((rotation[0], fixed))  # rotation[0] is white
-        else:
-            pairings.append((fixed, rotation[0]))  # fixed is white
-
-        # Pair remaining
-        for i in range(1, n // 2):
-            a = rotation[i]
-            b = rotation[-i]
-            if round_num % 2 == 0:
-                pairings.append((a, b))  # a is white
-            else:
-                pairings.append((b, a))  # b is white
-
-        rounds.append(pairings)
-        rotation = [rotation[-1]] + rotation[:-1]
-
-    # For double round-robin, repeat and swap colors
-    if double_round_robin:
-        second_cycle = []
-        for pairings in rounds:
-            swapped = [(b, a) for (a, b) in pairings]
-            second_cycle.append(swapped)
-        rounds += second_cycle
-
-    return rounds
+from src.auth.schemas import Principal
+
+
+def tournament_list_item(t: Tournament, players: list[dict] | None = None) -> dict:
+    '''
+    A tournament as lists render it (list fetch plan): its fields and players, no rounds.
+    players: already serialized players (e.g. aggregated by the query), instead of t.players.
+    '''
+    return {
+        "name": t.name,
+        "location": t.location,
+        "start_date": t.start_date,
+        "end_date": t.end_date,
+        "time_control": t.time_control.value if t.time_control else None,
+        "status": t.status.value if t.status else None,
+        "format": t.format.value if t.format else None,
+        "nb_of_players": t.nb_of_players,
+        "id": t.id,
+        "players": players if players is not None else [{"id": p.id, "name": p.name, "rating": p.rating} for p in t.players],
+    }
+
+
+def tournament_to_dict(t: Tournament) -> dict:
+    '''
+    Same shape as the Tournament response schema, built straight from the loaded rows (detail fetch plan).
+    Matchup players come from the tournament's players, so no relationship gets lazy loaded.
+    '''
+    item = tournament_list_item(t)
+    players = {p["id"]: p for p in item["players"]}
+    return {
+        **item,
+        "rounds": [
+            {
+                "id": r.id,
+                "round_number": r.round_number,
+                "tournament_id": r.tournament_id,
+                "matchups": [
+                    {
+                        "id": m.id,
+                        "round_id": m.round_id,
+                        "white_player": players.get(m.white_player_id),
+                        "black_player": players.get(m.black_player_id),
+                        "result": m.result.value if m.result else None,
+                        "version": m.version,
+                    }
+                    for m in r.matchups
+                ],
+            }
+            for r in sorted(t.rounds, key=lambda r: r.round_number)
+        ],
+    }
+
+
+def dump_tournament(t: Tournament) -> bytes:
+    return orjson.dumps(tournament_to_dict(t))
+
+
+def dump_tournaments(tournaments: list[Tournament]) -> bytes:
+    return orjson.dumps([tournament_list_item(t) for t in tournaments])
 
 
 class TournamentService:
     async def get_tournament(self, id: int, session: AsyncSession):
         '''
-        selectinload tells SQLAlchemy to fetch related objects (like rounds and their matchups) in advance, while the session is still open.
-        This prevents the need for lazy loading after the session is closed, which causes the MissingGreenlet error.
+        Tournament with its players, rounds and matchups (detail fetch plan).
+        Relationships are never lazy loaded, anything used later has to be loaded here.
         '''
         statement = (
             select(Tournament)
             .where(Tournament.id == id)
-            .options(
-                selectinload(Tournament.rounds).selectinload(Round.matchups),
-                selectinload(Tournament.players)
-            )
+            .options(*TOURNAMENT_DETAIL)
+            # Overwrite objects already in the session, rounds/matchups may have been written with bulk statements.
+            .execution_options(populate_existing=True)
         )
         result = await session.exec(statement)
         tournament = result.first()
         return tournament
 
-    async def delete_tournament(self, id: int, session: AsyncSession):
-        tournament = await self.get_tournament(id, session)
-        await session.delete(tournament)
+    async def delete_tournament(self, id: int, session: AsyncSession) -> dict:
+        '''
+        One DELETE, nothing loaded: players, rounds, matchups, standings, Swiss states and the bracket
+        go with the ON DELETE CASCADE foreign keys. The cascaded rows are counted in the same statement.
+        Returns {"tournaments", "players", "rounds", "matchups"}.
+        '''
+        deleted = delete(Tournament).where(Tournament.id == id).returning(Tournament.id).cte("deleted")
+        statement = select(
+            deleted.c.id,
+            select(func.count()).select_from(Player).where(Player.tournament_id == id).scalar_subquery().label("players"),
+            select(func.count()).select_from(Round).where(Round.tournament_id == id).scalar_subquery().label("rounds"),
+            select(func.count()).select_from(Matchup).join(Round, Round.id == Matchup.round_id)
+                .where(Round.tournament_id == id).scalar_subquery().label("matchups"),
+        )
+        result = await session.exec(statement)
+        row = result.first()
+        if row is None:
+            raise TournamentNotFound()
         await session.commit()
+        return {"tournaments": 1, "players": row.players, "rounds": row.rounds, "matchups": row.matchups}
 
     async def create_tournament(self, payload: TournamentCreate, user_id: int, session: AsyncSession):
         statement = select(Tournament).where(Tournament.name == payload.name)
@@ -126,10 +148,9 @@ class TournamentService:
         new_tournament.manager_id = user_id
         session.add(new_tournament)
         await session.commit()
-        await session.refresh(new_tournament)
-        return new_tournament
+        return await self.get_tournament(new_tournament.id, session)
 
-    async def update_tournament(self, id: int, payload: TournamentUpdate, current_user: User, session: AsyncSession):
+    async def update_tournament(self, id: int, payload: TournamentUpdate, current_user: Principal, session: AsyncSession):
         tournament = await self.get_tournament(id, session)
 
         # For finishing the tournament, check if all matchups have a result
@@ -149,19 +170,41 @@ class TournamentService:
         else:
             raise InsufficientPermission()
 
-    async def get_all_tournaments(self, user_id: int, limit: int, sort: str, status: str, session: AsyncSession):
+    async def get_all_tournaments(
+        self,
+        user_id: int,
+        limit: int,
+        sort: str,
+        status: str,
+        session: AsyncSession,
+        cursor: str | None = None,
+        time_control: TimeControl | None = None,
+        format: Format | None = None,
+        date_from: date | None = None,
+        date_to: date | None = None
+    ) -> tuple[list[Tournament], str | None]:
+        '''
+        One page of the user's tournaments with the given status, ordered by (start_date, id).
+        Filters and the keyset condition are all served by the tournaments indexes.
+        Returns (tournaments, cursor of the next page or None).
+        '''
         status_key = next((e.name for e in Status if e.value == status), None)
         if not status_key:
             raise ValueError("Invalid status value")
-        order = desc(Tournament.start_date) if sort == "desc" else asc(Tournament.start_date)
-        statement = select(Tournament).where(Tournament.manager_id == user_id).limit(limit).order_by(order)
-        if user_id is not None:
-            # statement = select(Tournament).where(Tournament.manager_id == user_id).limit(limit).order_by(order)
-            statement = select(Tournament).where((Tournament.manager_id == user_id) & (Tournament.status == status_key)).limit(limit).order_by(order)
-        else:
-            statement = select(Tournament).limit(limit).order_by(order)
-        result = await session.exec(statement)
-        return result.all()
+        statement = select(Tournament).where((Tournament.manager_id == user_id) & (Tournament.status == status_key))
+        if time_control is not None:
+            statement = statement.where(Tournament.time_control == time_control)
+        if format is not None:
+            statement = statement.where(Tournament.format == format)
+        if date_from is not None:
+            statement = statement.where(Tournament.start_date >= date_from)
+        if date_to is not None:
+            statement = statement.where(Tournament.start_date <= date_to)
+
+        after = decode_cursor(cursor, date.fromisoformat, int) if cursor else None
+        statement = keyset(statement, (Tournament.start_date, Tournament.id), after, sort == "desc", limit)
+        result = await session.exec(statement.options(*TOURNAMENT_LIST))
+        return page(result.all(), limit, lambda t: (t.start_date, t.id))
 
     async def start_tournament(self, tournament_id: int, session: AsyncSession):
         tournament = await self.get_tournament(tournament_id, session)
@@ -170,41 +213,269 @@ class TournamentService:
 
         tournament.status = Status.ONGOING
         session.add(tournament)
+
+        # Status change, standings, rounds and matchups all go in the same transaction.
+        session.add_all([Standing(player_id=p.id, tournament_id=tournament.id) for p in tournament.players])
+        if tournament.format == Format.SWISS:
+            # Swiss rounds are paired one at a time, see next_round().
+            states = [SwissState(player_id=p.id, tournament_id=tournament.id) for p in tournament.players]
+            session.add_all(states)
+            ratings = {p.id: p.rating for p in tournament.players}
+            await self.pair_swiss_round(tournament.id, 1, [(s, ratings[s.player_id]) for s in states], session)
+        elif tournament.format in (Format.ELIMINATION, Format.DOUBLE_ELIMINATION):
+            await self.start_bracket(tournament, session)
+        else:
+            player_ids = seed_by_rating([(p.id, p.rating) for p in tournament.players])
+            double_rr = tournament.format == Format.DOUBLE_ROUND_ROBIN
+            rounds_pairings = round_robin_pairings(player_ids, double_round_robin=double_rr)
+            await write_pairings(tournament.id, rounds_pairings, session)
         await session.commit()
-        await session.refresh(tournament)
 
-        statement = select(Player).where(Player.tournament_id == tournament.id)
-        result = await session.exec(statement)
-        players = result.all()
-        player_ids = [p.id for p in players]
+        return await self.get_tournament(tournament_id, session)
 
-        double_rr = tournament.format == Format.DOUBLE_ROUND_ROBIN
-        rounds_pairings = berger_table_pairings(player_ids, double_round_robin=double_rr)
 
-        for round_number, pairings in enumerate(rounds_pairings, start=1):
-            round_obj = Round(
-                tournament_id=tournament.id,
-                round_number=round_number
+    async def pair_swiss_round(self, tournament_id: int, round_number: int, states: list[tuple[SwissState, int]], session: AsyncSession):
+        '''
+        Pairs one Swiss round from the stored states (state, rating) and writes it.
+        Colours, opponents, floats and byes are recorded on the states. Does not commit.
+        '''
+        entrants = {
+            state.player_id: Entrant(
+                id=state.player_id,
+                rating=rating,
+                score=state.score,
+                colors=state.colors,
+                opponents=set(state.opponents),
+                had_bye=state.had_bye,
+                last_float=state.last_float
             )
-            session.add(round_obj)
-            await session.commit()
-            await session.refresh(round_obj)
-
-            for white_id, black_id in pairings:
-                if white_id is None or black_id is None:
-                    continue  # Bye
-                matchup = Matchup(
-                    round_id=round_obj.id,
-                    white_player_id=white_id,
-                    black_player_id=black_id,
-                    result=Result.NO_RESULT  # or default value
-                )
-                session.add(matchup)
-            await session.commit()
-
-        await session.refresh(tournament)
+            for state, rating in states
+        }
+        pairings, bye_id = pair_round(list(entrants.values()))
+        record_pairings(entrants, pairings, bye_id)
+        await write_pairings(tournament_id, [pairings], session, first_round=round_number)
+        if bye_id is not None:
+            rows = await self.get_standings_rows(tournament_id, {bye_id}, session)
+            if bye_id in rows:
+                standings.apply_bye(rows, bye_id, BYE_POINTS)
+                session.add_all(rows.values())
+
+        for state, _ in states:
+            entrant = entrants[state.player_id]
+            state.score = entrant.score
+            state.colors = entrant.colors
+            state.opponents = sorted(entrant.opponents) # new list, so the ARRAY change gets detected
+            state.had_bye = entrant.had_bye
+            state.last_float = entrant.last_float
+            session.add(state)
+
+    async def lock_tournament(self, tournament_id: int, session: AsyncSession) -> Tournament:
+        '''
+        Locks the tournament row until the transaction ends. Everything that reads and writes back
+        standings, Swiss states or the bracket takes it first, so two arbiters saving results
+        (or pairing a round) at the same time run one after the other instead of losing an update.
+        '''
+        result = await session.exec(
+            select(Tournament).where(Tournament.id == tournament_id).with_for_update().execution_options(populate_existing=True)
+        )
+        tournament = result.first()
+        if tournament is None:
+            raise TournamentNotFound()
         return tournament
 
+    async def next_round(self, tournament_id: int, session: AsyncSession):
+        '''
+        Pairs the next round of a Swiss tournament once every game of the current round has a result.
+        The checks only read the locked tournament row and one aggregate on the latest round,
+        the tournament is loaded in full once, for the response.
+        '''
+        tournament = await self.lock_tournament(tournament_id, session)
+        if tournament.format != Format.SWISS:
+            raise InvalidTournamentFormat()
+        if tournament.status != Status.ONGOING:
+            raise TournamentStarted("Next round cannot be paired.")
+
+        latest = select(func.max(Round.round_number)).where(Round.tournament_id == tournament_id).scalar_subquery()
+        unfinished = exists().where(
+            (Matchup.round_id == Round.id) &
+            (Round.tournament_id == tournament_id) &
+            (Round.round_number == latest) &
+            or_(Matchup.result == Result.NO_RESULT, Matchup.result.is_(None))
+        )
+        result = await session.exec(select(latest, unfinished))
+        current_round_number, round_not_finished = result.one()
+        if round_not_finished:
+            raise RoundNotFinished()
+
+        statement = (
+            select(SwissState, Player.rating)
+            .join(Player, Player.id == SwissState.player_id)
+            .where(SwissState.tournament_id == tournament_id)
+        )
+        result = await session.exec(statement)
+        states = result.all()
+
+        round_number = (current_round_number or 0) + 1
+        await self.pair_swiss_round(tournament_id, round_number, states, session)
+        await session.commit()
+
+        return await self.get_tournament(tournament_id, session)
+
+    async def apply_swiss_results(self, changes: list[tuple[Matchup, Result, Result]], session: AsyncSession):
+        '''
+        Applies the score difference of changed results (matchup, old result, new result) to the Swiss states.
+        Does not commit.
+        '''
+        player_ids = {pid for m, _, _ in changes for pid in (m.white_player_id, m.black_player_id)}
+        if not player_ids:
+            return
+        result = await session.exec(
+            select(SwissState).where(SwissState.player_id.in_(player_ids)).with_for_update()
+            .execution_options(populate_existing=True)
+        )
+        states = {state.player_id: state for state in result.all()}
+
+        for matchup, old, new in changes:
+            old_white, old_black = result_points(old)
+            new_white, new_black = result_points(new)
+            if matchup.white_player_id in states:
+                states[matchup.white_player_id].score += new_white - old_white
+            if matchup.black_player_id in states:
+                states[matchup.black_player_id].score += new_black - old_black
+        session.add_all(states.values())
+
+    async def start_bracket(self, tournament: Tournament, session: AsyncSession):
+        '''
+        Seeds the players by rating and creates every round up front.
+        Matchups are only created once both players of a match are known. Does not commit.
+        '''
+        double = tournament.format == Format.DOUBLE_ELIMINATION
+        seeded = sorted(tournament.players, key=lambda p: (-p.rating, p.id))
+        size = bracket_size(len(seeded))
+        slots, touched = new_bracket([p.id for p in seeded], double)
+
+        round_ids = await write_pairings(tournament.id, [[] for _ in range(nb_of_rounds(size, double))], session)
+        bracket = Bracket(
+            tournament_id=tournament.id,
+            size=size,
+            double=double,
+            slots=slots,
+            matchup_ids=[0] * len(bracket_template(size, double)),
+            round_ids=[round_ids[number] for number in sorted(round_ids)]
+        )
+        await self.sync_bracket_matchups(bracket, touched, session)
+        session.add(bracket)
+
+    async def sync_bracket_matchups(self, bracket: Bracket, touched: set[int], session: AsyncSession):
+        '''
+        Creates, re-pairs or removes the matchups of the bracket matches whose slots changed.
+        Raises ResultLocked if one of them already has a result. Does not commit.
+        '''
+        nodes = bracket_template(bracket.size, bracket.double)
+        slots = bracket.slots
+        matchup_ids = list(bracket.matchup_ids)
+
+        existing = [matchup_ids[m] for m in touched if matchup_ids[m]]
+        if existing:
+            result = await session.exec(select(Matchup.result).where(Matchup.id.in_(existing)))
+            if any(r not in (Result.NO_RESULT, None) for r in result.all()):
+                raise ResultLocked()
+
+        inserts, updates, deletes = [], [], []
+        for m in sorted(touched):
+            if is_ready(slots, m):
+                players = {"white_player_id": slots[2 * m], "black_player_id": slots[2 * m + 1]}
+                if matchup_ids[m]:
+                    updates.append({"id": matchup_ids[m], **players})
+                else:
+                    inserts.append({"round_id": bracket.round_ids[nodes[m].round - 1], "result": Result.NO_RESULT, **players})
+            elif matchup_ids[m]:
+                deletes.append(matchup_ids[m])
+                matchup_ids[m] = 0
+
+        if deletes:
+            await session.exec(delete(Matchup).where(Matchup.id.in_(deletes)))
+        if updates:
+            await session.exec(update(Matchup), params=updates)
+        if inserts:
+            statement = insert(Matchup).values(inserts).returning(Matchup.id, Matchup.round_id, Matchup.white_player_id)
+            result = await session.exec(statement)
+            created = {(round_id, white_id): matchup_id for matchup_id, round_id, white_id in result.all()}
+            for m in touched:
+                if is_ready(slots, m) and not matchup_ids[m]:
+                    matchup_ids[m] = created[(bracket.round_ids[nodes[m].round - 1], slots[2 * m])]
+
+        bracket.matchup_ids = matchup_ids
+
+    async def apply_bracket_results(self, tournament_id: int, changes: list[tuple[Matchup, Result, Result]], session: AsyncSession):
+        '''
+        Moves winners and losers of the changed matchups through the bracket.
+        Only the branches below those matches are touched. Does not commit.
+        '''
+        bracket = await session.get(Bracket, tournament_id)
+        if bracket is None:
+            return
+        nodes = bracket_template(bracket.size, bracket.double)
+        slots = list(bracket.slots)
+        match_of = {matchup_id: m for m, matchup_id in enumerate(bracket.matchup_ids) if matchup_id}
+
+        touched = set()
+        for matchup, _, new in changes:
+            match = match_of.get(matchup.id)
+            if match is None:
+                continue
+            # A draw does not decide an elimination match, the arbiter records the tiebreak winner.
+            winner_side = {Result.WHITE_WINS: 0, Result.BLACK_WINS: 1}.get(new)
+            touched |= record_result(slots, nodes, match, winner_side)
+
+        bracket.slots = slots
+        await self.sync_bracket_matchups(bracket, touched, session)
+        session.add(bracket)
+
+    async def get_bracket(self, tournament_id: int, session: AsyncSession):
+        '''
+        Live bracket in O(matches): the bracket row, plus plain column reads of players and results.
+        '''
+        bracket = await session.get(Bracket, tournament_id)
+        if bracket is None:
+            raise BracketNotFound()
+        nodes = bracket_template(bracket.size, bracket.double)
+
+        result = await session.exec(
+            select(Player.id, Player.name, Player.rating).where(Player.tournament_id == tournament_id)
+        )
+        players = [{"id": id, "name": name, "rating": rating} for id, name, rating in result.all()]
+
+        results = {}
+        matchup_ids = [matchup_id for matchup_id in bracket.matchup_ids if matchup_id]
+        if matchup_ids:
+            result = await session.exec(select(Matchup.id, Matchup.result).where(Matchup.id.in_(matchup_ids)))
+            results = {matchup_id: r for matchup_id, r in result.all()}
+
+        slots = bracket.slots
+        matches = []
+        for m, node in enumerate(nodes):
+            white, black = slots[2 * m], slots[2 * m + 1]
+            matchup_id = bracket.matchup_ids[m] or None
+            matches.append({
+                "match": m,
+                "section": node.section,
+                "round_number": node.round,
+                "white_player_id": white if white > 0 else None,
+                "black_player_id": black if black > 0 else None,
+                "bye": BYE in (white, black),
+                "matchup_id": matchup_id,
+                "result": results[matchup_id].value if matchup_id in results and results[matchup_id] else None,
+            })
+
+        return {
+            "tournament_id": tournament_id,
+            "double": bracket.double,
+            "size": bracket.size,
+            "champion_id": slots[-1] if slots[-1] > 0 else None,
+            "players": players,
+            "matches": matches,
+        }
 
     async def end_tournament(self, tournament_id: int, session: AsyncSession):
         tournament = await self.get_tournament(tournament_id, session)
@@ -214,59 +485,75 @@ class TournamentService:
         tournament.status = Status.FINISHED
         session.add(tournament)
         await session.commit()
-        await session.refresh(tournament)
-        return tournament
-
-
-    async def get_matchups(self, tournament_id: int, round_number: int, session: AsyncSession):
-        # Find the round by tournament_id and round_number
-        statement = select(Round).where(
-            (Round.tournament_id == tournament_id) &
-            (Round.round_number == round_number)
-        )
-        round_obj = await session.exec(statement)
-        round_obj = round_obj.first()
-        if not round_obj:
-            return []
-        statement = select(Matchup).where(Matchup.round_id == round_obj.id)
-        matchups = await session.exec(statement)
-        return matchups.all()
-
-    async def update_results(self, tournament_id: int, round_number: int, payload: RoundResult, session: AsyncSession):
-        tournament = await self.get_tournament(tournament_id, session)
-        results = payload.results  # A list of {matchupId, result}
+        return await self.get_tournament(tournament_id, session)
 
-        matchups = await self.get_matchups(tournament_id, round_number, session)
-        matchup_dict = {m.id: m for m in matchups}
 
-        for r in results:
-            matchup_id = r.matchupId
-            result = r.result
-            matchup = matchup_dict.get(matchup_id)
-            if matchup:
-                matchup.result = result
-                session.add(matchup)
+    async def update_results(self, tournament_id: int, round_number: int, payload: RoundResult, session: AsyncSession) -> dict:
+        '''
+        Saves the results of a round with one set-based UPDATE (see write_results) and applies
+        the changed ones to standings, Swiss states or the bracket, all in one transaction.
+        Raises ResultConflict, and changes nothing, if a matchup changed since the arbiter loaded it.
+        Returns the delta: the matchups whose result changed, with their new version.
+        '''
+        tournament = await self.lock_tournament(tournament_id, session)
 
+        rows = await write_results(
+            tournament_id, round_number, [(r.matchupId, r.result, r.version) for r in payload.results], session
+        )
+        if any(
+            r.submitted_version is not None and r.submitted_version != r.old_version and r.submitted_result != r.old_result
+            for r in rows
+        ):
+            await session.rollback()
+            raise ResultConflict()
+
+        # rows carry id, white_player_id and black_player_id, like the matchups the appliers expect
+        changes = [(r, r.old_result, r.result) for r in rows if r.version is not None]
+        if changes:
+            await self.update_standings(tournament_id, changes, session)
+            if tournament.format == Format.SWISS:
+                await self.apply_swiss_results(changes, session)
+            elif tournament.format in (Format.ELIMINATION, Format.DOUBLE_ELIMINATION):
+                await self.apply_bracket_results(tournament_id, changes, session)
         await session.commit()
-        # After committing, always re-fetch the tournament with eager loading before returning it.
-        tournament = await self.get_tournament(tournament_id, session)
-        return tournament
-
-    async def generate_players(self, tournament_id: int, session: AsyncSession):
-        tournament = await self.get_tournament(tournament_id, session)
-        nb_of_players = tournament.nb_of_players
-
-        counter = 1
-        if len(tournament.players) <= nb_of_players:
-            counter = len(tournament.players) + 1
-        while counter <= nb_of_players:
-            payload = PlayerCreate(name=f"Player#{counter + 1}", rating=random.randint(400,4000))
-            _ = await player_service.create_player(tournament_id, payload, session)
-            counter += 1
 
+        return {
+            "tournament_id": tournament_id,
+            "round_number": round_number,
+            "matchups": [
+                {"id": r.id, "result": r.result.value, "version": r.version} for r, _, _ in changes
+            ],
+        }
+
+    async def generate_players(
+        self,
+        tournament_id: int,
+        session: AsyncSession,
+        distribution: RatingDistribution = RatingDistribution.UNIFORM,
+        mean: int = 1500,
+        deviation: int = 350,
+        seed: int | None = None
+    ):
+        '''
+        Fills the free places of the tournament with synthetic players (see field.py),
+        written with one multi-row INSERT.
+        '''
+        result = await session.exec(
+            select(Tournament.nb_of_players).where(Tournament.id == tournament_id).with_for_update()
+        )
+        nb_of_players = result.first()
+        if nb_of_players is None:
+            raise TournamentNotFound()
+
+        result = await session.exec(select(Player.name).where(Player.tournament_id == tournament_id))
+        taken = set(result.all())
+        missing = nb_of_players - len(taken)
+        if missing > 0:
+            field = synthetic_field(missing, taken, distribution, mean, deviation, seed)
+            rows = [{"name": name, "rating": rating, "tournament_id": tournament_id} for name, rating in field]
+            await session.exec(insert(Player).values(rows))
         await session.commit()
-        tournament = await self.get_tournament(tournament_id, session)
-        return tournament
+        return await self.get_tournament(tournament_id, session)
 
     async def total_tournaments(self, user_id: int, session: AsyncSession):
         statement = (
@@ -279,33 +566,159 @@ class TournamentService:
         # Convert to dict: {status_value: count}
         return {status: count for status, count in rows}
 
+    async def get_dashboard(self, user_id: int, limit: int, session: AsyncSession) -> bytes:
+        '''
+        Counts per status plus the first page (newest first) of every status list.
+        One statement, whatever the limit: the user's tournaments are ranked inside their status
+        and counted with window functions, and the players of every listed tournament are
+        aggregated to JSON by a LATERAL subquery. Tournaments have no rounds here, like in the lists.
+        Next cursors continue with fetch_tournaments (sort=desc, no filters).
+        Returns the serialized response: {status: {count, tournaments, next_cursor}}.
+        '''
+        ranked = select(
+            Tournament.id,
+            func.row_number().over(
+                partition_by=Tournament.status,
+                order_by=(desc(Tournament.start_date), desc(Tournament.id))
+            ).label("rank"),
+            func.count().over(partition_by=Tournament.status).label("total"),
+        ).where(Tournament.manager_id == user_id).subquery()
+        players = (
+            select(
+                func.coalesce(
+                    func.json_agg(
+                        aggregate_order_by(func.json_build_object("id", Player.id, "name", Player.name, "rating", Player.rating), Player.id)
+                    ),
+                    literal_column("'[]'::json"),
+                    type_=JSON
+                ).label("players")
+            )
+            .where(Player.tournament_id == Tournament.id)
+            .lateral("tournament_players")
+        )
+        statement = (
+            select(Tournament, ranked.c.rank, ranked.c.total, players.c.players)
+            .join(ranked, ranked.c.id == Tournament.id)
+            .join(players, true())
+            .where(ranked.c.rank <= limit + 1)  # one extra row tells if there is a next page
+            .order_by(ranked.c.rank)
+        )
+        result = await session.exec(statement)
+
+        dashboard = {s.value: {"count": 0, "tournaments": [], "next_cursor": None} for s in Status}
+        for tournament, rank, total, tournament_players in result.all():
+            section = dashboard[tournament.status.value]
+            section["count"] = total
+            if rank <= limit:
+                section["tournaments"].append(tournament_list_item(tournament, tournament_players))
+            else:
+                last = section["tournaments"][-1]
+                section["next_cursor"] = encode_cursor(last["start_date"], last["id"])
+        return orjson.dumps(dashboard)
+
 
-    async def get_tournament_winner(self, tournament: Tournament) -> dict:
+    async def get_standings_rows(self, tournament_id: int, player_ids: set[int], session: AsyncSession) -> dict[int, Standing]:
         '''
-        Calculates the winner(s) of the tournament based on matchup results.
-        Returns a dict: {player_id: points}
+        Standings rows of the given players and of everyone who played them.
         '''
-        scores = {}
-        for player in tournament.players:
-            scores[player.id] = 0
+        ids = sorted(player_ids)
+        statement = select(Standing).where(
+            (Standing.tournament_id == tournament_id) &
+            or_(Standing.player_id.in_(ids), Standing.opponent_ids.overlap(ids))
+        ).with_for_update().execution_options(populate_existing=True)
+        result = await session.exec(statement)
+        return {row.player_id: row for row in result.all()}
 
-        for round_obj in tournament.rounds:
-            for matchup in round_obj.matchups:
-                # Score table: win=1, draw=0.5, loss=0
-                if matchup.result == Result.WHITE_WINS:
-                    scores[matchup.white_player_id] += 1
-                elif matchup.result == Result.BLACK_WINS:
-                    scores[matchup.black_player_id] += 1
-                elif matchup.result == Result.DRAW:
-                    scores[matchup.white_player_id] += 0.5
-                    scores[matchup.black_player_id] += 0.5
+    async def update_standings(self, tournament_id: int, changes: list[tuple[Matchup, Result, Result]], session: AsyncSession):
+        '''
+        Applies changed results (matchup, old result, new result) to the materialized standings. Does not commit.
+        '''
+        player_ids = {pid for m, _, _ in changes for pid in (m.white_player_id, m.black_player_id)}
+        if not player_ids:
+            return
+        rows = await self.get_standings_rows(tournament_id, player_ids, session)
+        if not player_ids <= rows.keys():
+            return # not materialized yet, get_standings() rebuilds them
+        for matchup, old, new in changes:
+            standings.apply_result(rows, matchup.id, matchup.white_player_id, matchup.black_player_id, old, new)
+        session.add_all(rows.values())
+
+    async def rebuild_standings(self, tournament_id: int, session: AsyncSession):
+        '''
+        Computes the standings from scratch, for tournaments started before they were materialized.
+        '''
+        result = await session.exec(select(Player.id).where(Player.tournament_id == tournament_id))
+        rows = {pid: Standing(player_id=pid, tournament_id=tournament_id) for pid in result.all()}
 
-        # Find the highest score
-        max_score = max(scores.values())
-        # generator expression
-        winner_id = next(pid for pid, pts in scores.items() if pts == max_score)
-        winner_obj = next(p for p in tournament.players if p.id == winner_id)
+        statement = (
+            select(Matchup.id, Matchup.white_player_id, Matchup.black_player_id, Matchup.result)
+            .join(Round, Round.id == Matchup.round_id)
+            .where((Round.tournament_id == tournament_id) & (Matchup.result != Result.NO_RESULT))
+        )
+        result = await session.exec(statement)
+        for matchup_id, white_id, black_id, r in result.all():
+            standings.apply_result(rows, matchup_id, white_id, black_id, Result.NO_RESULT, r)
+
+        result = await session.exec(select(SwissState.player_id, SwissState.colors).where(SwissState.tournament_id == tournament_id))
+        for player_id, colors in result.all():
+            for _ in range(colors.count("-")):
+                standings.apply_bye(rows, player_id, BYE_POINTS)
+
+        session.add_all(rows.values())
+        await session.commit()
+
+    async def get_standings(self, tournament_id: int, session: AsyncSession) -> list[dict]:
+        '''
+        Ranked standings, read with one indexed query on the materialized rows.
+        '''
+        statement = (
+            select(Standing, Player.name, Player.rating)
+            .join(Player, Player.id == Standing.player_id)
+            .where(Standing.tournament_id == tournament_id)
+        )
+        result = await session.exec(statement)
+        rows = result.all()
+        if not rows:
+            result = await session.exec(select(Tournament.status).where(Tournament.id == tournament_id))
+            status = result.first()
+            if status is None:
+                raise TournamentNotFound()
+            if status == Status.NOT_STARTED:
+                return []
+            await self.rebuild_standings(tournament_id, session)
+            result = await session.exec(statement)
+            rows = result.all()
+
+        players = {row.player_id: {"id": row.player_id, "name": name, "rating": rating} for row, name, rating in rows}
+        ranked = standings.rank([row for row, _, _ in rows])
+        return [
+            {
+                "rank": position,
+                "player": players[row.player_id],
+                "points": row.points,
+                "head_to_head": head_to_head,
+                "sonneborn_berger": row.sonneborn_berger,
+                "buchholz": row.buchholz,
+                "wins": row.wins,
+                "games_played": row.games_played,
+            }
+            for position, (row, head_to_head) in enumerate(ranked, start=1)
+        ]
+
+    async def get_tournament_winner(self, tournament: Tournament, session: AsyncSession) -> dict | None:
+        '''
+        Winner of the tournament: top of the standings, or the bracket champion for elimination formats.
+        Returns a dict: {"winner": player, "score": points}
+        '''
+        table = await self.get_standings(tournament.id, session)
+        if not table:
+            return None
+        top = table[0]
+        if tournament.format in (Format.ELIMINATION, Format.DOUBLE_ELIMINATION):
+            bracket = await session.get(Bracket, tournament.id)
+            if bracket is not None:
+                top = next((row for row in table if row["player"]["id"] == bracket.slots[-1]), top)
         return {
-            "winner": winner_obj.model_dump(mode="json"),
-            "score": max_score
-        }
\ No newline at end of file
+            "winner": top["player"],
+            "score": top["points"]
+        }
@@ -0,0 +1,110 @@
+'''
+Incremental standings.
+
+Every player has one materialized standings row holding points, wins, Buchholz and
+Sonneborn-Berger, plus the games behind them as parallel arrays
+(matchup_ids, opponent_ids, scores). A result change only touches the two players
+of the game and the rows of their opponents, whose tiebreaks depend on their points.
+Head-to-head is only meaningful between tied players, so it is worked out when ranking.
+'''
+from src.utils.enums import Result
+
+from .scoring import result_points
+
+
+def _set_points(rows: dict, player_id: int, points: float) -> None:
+    '''
+    Changes a player's points and passes the difference on to the tiebreaks of the opponents.
+    '''
+    row = rows[player_id]
+    delta = points - row.points
+    if delta == 0:
+        return
+    row.points = points
+    for other in rows.values():
+        for opponent_id, score in zip(other.opponent_ids, other.scores):
+            if opponent_id == player_id:
+                other.buchholz += delta
+                other.sonneborn_berger += score * delta
+
+
+def _add_game(rows: dict, player_id: int, opponent_id: int, matchup_id: int, score: float) -> None:
+    row = rows[player_id]
+    opponent_points = rows[opponent_id].points
+    # new lists, so the ARRAY changes get detected
+    row.matchup_ids = row.matchup_ids + [matchup_id]
+    row.opponent_ids = row.opponent_ids + [opponent_id]
+    row.scores = row.scores + [score]
+    row.games_played += 1
+    row.wins += score == 1
+    row.buchholz += opponent_points
+    row.sonneborn_berger += score * opponent_points
+
+
+def _remove_game(rows: dict, player_id: int, matchup_id: int) -> None:
+    row = rows[player_id]
+    if matchup_id not in row.matchup_ids:
+        return
+    i = row.matchup_ids.index(matchup_id)
+    opponent_id, score = row.opponent_ids[i], row.scores[i]
+    opponent_points = rows[opponent_id].points
+    row.matchup_ids = row.matchup_ids[:i] + row.matchup_ids[i + 1:]
+    row.opponent_ids = row.opponent_ids[:i] + row.opponent_ids[i + 1:]
+    row.scores = row.scores[:i] + row.scores[i + 1:]
+    row.games_played -= 1
+    row.wins -= score == 1
+    row.buchholz -= opponent_points
+    row.sonneborn_berger -= score * opponent_points
+
+
+def apply_result(rows: dict, matchup_id: int, white_id: int, black_id: int, old: Result | None, new: Result | None) -> None:
+    '''
+    Moves the standings from the old to the new result of a game.
+    rows must hold both players and every row that has one of them as opponent.
+    '''
+    if old == new:
+        return
+    if old not in (Result.NO_RESULT, None):
+        old_white, old_black = result_points(old)
+        _remove_game(rows, white_id, matchup_id)
+        _remove_game(rows, black_id, matchup_id)
+        _set_points(rows, white_id, rows[white_id].points - old_white)
+        _set_points(rows, black_id, rows[black_id].points - old_black)
+    if new not in (Result.NO_RESULT, None):
+        new_white, new_black = result_points(new)
+        _set_points(rows, white_id, rows[white_id].points + new_white)
+        _set_points(rows, black_id, rows[black_id].points + new_black)
+        _add_game(rows, white_id, black_id, matchup_id, new_white)
+        _add_game(rows, black_id, white_id, matchup_id, new_black)
+
+
+def apply_bye(rows: dict, player_id: int, points: float) -> None:
+    _set_points(rows, player_id, rows[player_id].points + points)
+
+
+def rank(rows: list) -> list[tuple[object, float]]:
+    '''
+    Orders rows by points, head-to-head (between tied players), Sonneborn-Berger, Buchholz and wins.
+    Returns [(row, head_to_head), ...].
+    '''
+    tied = {}
+    for row in rows:
+        tied.setdefault(row.points, set()).add(row.player_id)
+
+    ranked = []
+    for row in rows:
+        group = tied[row.points]
+        head_to_head = sum(
+            score for opponent_id, score in zip(row.opponent_ids, row.scores) if opponent_id in group
+        ) if len(group) > 1 else 0
+        ranked.append((row, head_to_head))
+
+    ranked.sort(key=lambda item: (
+        -item[0].points,
+        -item[1],
+        -item[0].sonneborn_berger,
+        -item[0].buchholz,
+        -item[0].wins,
+        item[0].player_id,
+    ))
+    return ranked
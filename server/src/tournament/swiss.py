@@ -0,0 +1,227 @@
+'''
+Swiss-system pairing engine.
+
+Works on a small in-memory view of every player (Entrant), built from the stored
+swiss_states rows. Nothing here touches the database or re-reads old rounds:
+scores are kept up to date as results come in, colours, opponents and floats are
+appended when a round is paired.
+'''
+from dataclasses import dataclass, field
+
+from .scoring import BYE_POINTS
+
+# Upper bound on backtracking steps of one search, before the next (relaxed) one is tried.
+MAX_SEARCH_STEPS = 200_000
+
+# Searches tried in order, until one finds a pairing: (allow repeat pairings, allow colour breaks).
+# Absolute colour preferences (no third game in a row with the same colour, colour difference
+# never above 2) and no repeats are hard rules, colours give way first, repeats last.
+SEARCHES = ((False, False), (False, True), (True, False), (True, True))
+
+WHITE = "W"
+BLACK = "B"
+BYE = "-"
+
+FLOAT_UP = 1
+FLOAT_DOWN = -1
+
+
+@dataclass(slots=True)
+class Entrant:
+    id: int
+    rating: int
+    score: float = 0
+    colors: str = ""  # one char per round: W, B or - for a bye
+    opponents: set[int] = field(default_factory=set)
+    had_bye: bool = False
+    last_float: int = 0  # FLOAT_UP, FLOAT_DOWN or 0
+
+    def color_preference(self) -> int:
+        '''
+        Positive wants white, negative wants black.
+        3 = absolute, 2 = strong, 1 = mild, 0 = none (no games played yet).
+        '''
+        played = self.colors.replace(BYE, "")
+        if not played:
+            return 0
+        balance = played.count(WHITE) - played.count(BLACK)
+        if balance < -1 or played.endswith(BLACK * 2):
+            return 3
+        if balance > 1 or played.endswith(WHITE * 2):
+            return -3
+        if balance != 0:
+            return -2 if balance > 0 else 2
+        return 1 if played[-1] == BLACK else -1
+
+
+def color_conflict(a: Entrant, b: Entrant) -> int:
+    '''
+    0 when both can get their colour, 1 when one of them cannot, 2 when both have the same absolute preference:
+    one of them would play a third game in a row with the same colour or go 3 games above the other colour.
+    '''
+    pa, pb = a.color_preference(), b.color_preference()
+    if pa * pb <= 0:
+        return 0
+    if abs(pa) == 3 and abs(pb) == 3:
+        return 2
+    return 1
+
+
+def allocate_colors(a: Entrant, b: Entrant, board: int) -> tuple[Entrant, Entrant]:
+    '''
+    Returns (white, black). a is the higher ranked player.
+    '''
+    pa, pb = a.color_preference(), b.color_preference()
+    if pa != pb:
+        return (a, b) if pa > pb else (b, a)
+    # Same preference: alternate from the last round where their colours differed.
+    for ca, cb in zip(reversed(a.colors), reversed(b.colors)):
+        if ca != cb and BYE not in (ca, cb):
+            return (a, b) if ca == BLACK else (b, a)
+    if pa != 0:
+        return (a, b) if pa > 0 else (b, a)
+    # First round: top seed gets white on odd boards.
+    return (a, b) if board % 2 == 0 else (b, a)
+
+
+def float_penalty(higher: Entrant, lower: Entrant) -> int:
+    '''
+    Pairing across score groups floats the higher player down and the lower player up.
+    Avoid floating the same player in the same direction twice in a row.
+    '''
+    if higher.score == lower.score:
+        return 0
+    return (higher.last_float == FLOAT_DOWN) + (lower.last_float == FLOAT_UP)
+
+
+def rank(entrants: list[Entrant]) -> list[Entrant]:
+    return sorted(entrants, key=lambda e: (-e.score, -e.rating, e.id))
+
+
+def choose_bye(ranked: list[Entrant]) -> Entrant | None:
+    '''
+    Lowest ranked player that has not had a bye yet.
+    '''
+    if len(ranked) % 2 == 0:
+        return None
+    return next((e for e in reversed(ranked) if not e.had_bye), ranked[-1])
+
+
+def _pair(ranked: list[Entrant], allow_repeats: bool, allow_color_breaks: bool) -> list[tuple[Entrant, Entrant]] | None:
+    '''
+    Pairs top-down with backtracking.
+    Players who already met, and (unless allow_color_breaks) two players with the same absolute
+    colour preference, are never candidates for each other.
+    Candidates for a player are ordered by score difference (own group first, then floaters),
+    colour conflicts, repeated floats and finally distance to the Dutch S1/S2 partner.
+    '''
+    n = len(ranked)
+    group_pos = {}
+    group_half = {}
+    start = 0
+    while start < n:
+        end = start
+        while end < n and ranked[end].score == ranked[start].score:
+            end += 1
+        for pos in range(start, end):
+            group_pos[ranked[pos].id] = pos - start
+            group_half[ranked[pos].id] = (end - start) // 2
+        start = end
+
+    paired = [False] * n
+    pairs = []
+    steps = 0
+
+    def candidates(i: int) -> list[int]:
+        a = ranked[i]
+        target = group_pos[a.id] + group_half[a.id]
+        options = []
+        for j in range(i + 1, n):
+            if paired[j]:
+                continue
+            b = ranked[j]
+            if not allow_repeats and b.id in a.opponents:
+                continue
+            conflict = color_conflict(a, b)
+            if conflict == 2 and not allow_color_breaks:
+                continue
+            key = (
+                a.score - b.score,
+                conflict,
+                float_penalty(a, b),
+                abs(group_pos[b.id] - target) if a.score == b.score else j,
+            )
+            options.append((key, j))
+        options.sort()
+        return [j for _, j in options]
+
+    def solve(i: int) -> bool:
+        nonlocal steps
+        while i < n and paired[i]:
+            i += 1
+        if i == n:
+            return True
+        paired[i] = True
+        for j in candidates(i):
+            steps += 1
+            if steps > MAX_SEARCH_STEPS:
+                break
+            paired[j] = True
+            pairs.append((ranked[i], ranked[j]))
+            if solve(i + 1):
+                return True
+            pairs.pop()
+            paired[j] = False
+        paired[i] = False
+        return False
+
+    return pairs if solve(0) else None
+
+
+def pair_round(entrants: list[Entrant]) -> tuple[list[tuple[int, int]], int | None]:
+    '''
+    Pairs the next round.
+    Returns ([(white_id, black_id), ...], bye_player_id) ordered by board.
+    Absolute colour preferences are only broken when no pairing keeps them,
+    repeat pairings only when no pairing without them exists (see SEARCHES).
+    '''
+    ranked = rank(entrants)
+    bye = choose_bye(ranked)
+    if bye is not None:
+        ranked.remove(bye)
+
+    for allow_repeats, allow_color_breaks in SEARCHES:
+        pairs = _pair(ranked, allow_repeats, allow_color_breaks)
+        if pairs is not None:
+            break
+
+    pairings = []
+    for board, (a, b) in enumerate(pairs):
+        white, black = allocate_colors(a, b, board)
+        pairings.append((white.id, black.id))
+    return pairings, (bye.id if bye else None)
+
+
+def record_pairings(entrants: dict[int, Entrant], pairings: list[tuple[int, int]], bye_id: int | None) -> None:
+    '''
+    Appends the colours, opponents and floats of a freshly paired round.
+    Scores are updated separately, when results are saved.
+    '''
+    for white_id, black_id in pairings:
+        white, black = entrants[white_id], entrants[black_id]
+        white.colors += WHITE
+        black.colors += BLACK
+        white.opponents.add(black_id)
+        black.opponents.add(white_id)
+        if white.score == black.score:
+            white.last_float = black.last_float = 0
+        else:
+            higher, lower = (white, black) if white.score > black.score else (black, white)
+            higher.last_float, lower.last_float = FLOAT_DOWN, FLOAT_UP
+
+    if bye_id is not None:
+        bye = entrants[bye_id]
+        bye.colors += BYE
+        bye.had_bye = True
+        bye.score += BYE_POINTS
+        bye.last_float = FLOAT_DOWN
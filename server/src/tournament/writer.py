@@ -0,0 +1,122 @@
+from sqlalchemy import Integer, column, insert, or_, select, update, values
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from src.db.models import Round, Matchup
+from src.utils.enums import Result
+
+# asyncpg caps a statement at 32767 bind params, a matchup row uses 4 of them.
+MATCHUP_BATCH_SIZE = 2000
+
+
+async def write_pairings(
+    tournament_id: int,
+    rounds_pairings: list[list[tuple[int | None, int | None]]],
+    session: AsyncSession,
+    first_round: int = 1
+) -> dict[int, int]:
+    '''
+    Bulk pairing writer.
+    Inserts all rounds with one INSERT ... RETURNING and their matchups with batched multi-row INSERTs.
+    Pairings with a None side are byes and get no matchup row.
+    Does not commit, the caller owns the transaction.
+    Returns a dict: {round_number: round_id}
+    '''
+    if not rounds_pairings:
+        return {}
+
+    round_rows = [
+        {"tournament_id": tournament_id, "round_number": round_number}
+        for round_number in range(first_round, first_round + len(rounds_pairings))
+    ]
+    statement = insert(Round).values(round_rows).returning(Round.id, Round.round_number)
+    result = await session.exec(statement)
+    round_ids = {round_number: round_id for round_id, round_number in result.all()}
+
+    matchup_rows = [
+        {
+            "round_id": round_ids[round_number],
+            "white_player_id": white_id,
+            "black_player_id": black_id,
+            "result": Result.NO_RESULT,
+        }
+        for round_number, pairings in enumerate(rounds_pairings, start=first_round)
+        for white_id, black_id in pairings
+        if white_id is not None and black_id is not None
+    ]
+    for i in range(0, len(matchup_rows), MATCHUP_BATCH_SIZE):
+        await session.exec(insert(Matchup).values(matchup_rows[i:i + MATCHUP_BATCH_SIZE]))
+
+    return round_ids
+
+
+async def write_results(
+    tournament_id: int,
+    round_number: int,
+    results: list[tuple[int, Result, int | None]],
+    session: AsyncSession
+) -> list:
+    '''
+    Bulk result writer.
+    Applies (matchup_id, result, version) triples to one round with a single statement:
+      - the submitted rows are a VALUES list,
+      - the current rows of the round are locked (FOR UPDATE) and read before the change,
+      - one UPDATE ... FROM VALUES writes every changed result and bumps its version.
+    A row is only written when its result changes and, if a version was sent, when it still
+    matches (optimistic locking). Matchups outside the round are ignored.
+    Does not commit, the caller owns the transaction.
+    Returns one row per matchup of the round in the payload with: id, white_player_id, black_player_id,
+    old_result, old_version, submitted_result, submitted_version, result and version
+    (result and version are None when the row was not written).
+    '''
+    if not results:
+        return []
+
+    submitted = select(
+        values(
+            column("id", Integer),
+            column("result", Matchup.__table__.c.result.type),
+            column("version", Integer),
+            name="submitted_values"
+        ).data(results)
+    ).cte("submitted")
+
+    round_id = select(Round.id).where(
+        (Round.tournament_id == tournament_id) & (Round.round_number == round_number)
+    ).scalar_subquery()
+    current = (
+        select(Matchup.id, Matchup.white_player_id, Matchup.black_player_id, Matchup.result, Matchup.version)
+        .join(submitted, submitted.c.id == Matchup.id)
+        .where(Matchup.round_id == round_id)
+        .with_for_update(of=Matchup)
+        .cte("current")
+    )
+    changed = (
+        update(Matchup)
+        .where(
+            (Matchup.id == current.c.id) &
+            (submitted.c.id == current.c.id) &
+            Matchup.result.is_distinct_from(submitted.c.result) &
+            or_(submitted.c.version.is_(None), Matchup.version == submitted.c.version)
+        )
+        .values(result=submitted.c.result, version=Matchup.version + 1)
+        .returning(Matchup.id, Matchup.result, Matchup.version)
+        .cte("changed")
+    )
+    statement = (
+        select(
+            current.c.id,
+            current.c.white_player_id,
+            current.c.black_player_id,
+            current.c.result.label("old_result"),
+            current.c.version.label("old_version"),
+            submitted.c.result.label("submitted_result"),
+            submitted.c.version.label("submitted_version"),
+            changed.c.result,
+            changed.c.version,
+        )
+        .join(submitted, submitted.c.id == current.c.id)
+        .outerjoin(changed, changed.c.id == current.c.id)
+        .order_by(current.c.id)
+    )
+    result = await session.exec(statement)
+    return result.all()
@@ -0,0 +1 @@
+from .routes import router as TransferRouter
\ No newline at end of file
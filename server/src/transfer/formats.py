@@ -0,0 +1,118 @@
+'''
+Bulk transfer formats. Both carry the same events: a tournament with its players, rounds and matchups.
+
+NDJSON: one event per line, e.g.
+    {"name": "Spring Open", ..., "players": [{"name": "Ann", "rating": 1800}, ...],
+     "rounds": [{"round_number": 1, "matchups": [{"white": "Ann", "black": "Bob", "result": "Draw"}]}]}
+
+CSV: one row per record, the "record" column tells which. A tournament row starts an event, the
+player, round and matchup rows after it belong to it. Matchups name their round, round rows are
+only needed for rounds without matchups. Quoted fields cannot span lines.
+'''
+import csv
+import io
+from typing import AsyncIterator
+
+import orjson
+
+from src.utils.errors import InvalidImport
+
+CSV_COLUMNS = [
+    "record", "name", "location", "start_date", "end_date", "time_control", "format", "status",
+    "nb_of_players", "rating", "round_number", "white", "black", "result",
+]
+TOURNAMENT_FIELDS = ["name", "location", "start_date", "end_date", "time_control", "format", "status", "nb_of_players"]
+
+
+async def ndjson_records(lines: AsyncIterator[tuple[int, bytes]]) -> AsyncIterator[tuple[int, dict]]:
+    '''
+    Yields (line number, event) per non empty line.
+    '''
+    async for number, line in lines:
+        if not line.strip():
+            continue
+        try:
+            record = orjson.loads(line)
+        except orjson.JSONDecodeError:
+            raise InvalidImport(number, "Invalid JSON.")
+        if not isinstance(record, dict):
+            raise InvalidImport(number, "Expected a JSON object.")
+        yield number, record
+
+
+def _csv_row(number: int, line: bytes) -> list[str]:
+    try:
+        return next(csv.reader([line.decode("utf-8-sig")]), [])
+    except (UnicodeDecodeError, csv.Error) as exc:
+        raise InvalidImport(number, f"Invalid CSV row: {exc}")
+
+
+async def csv_records(lines: AsyncIterator[tuple[int, bytes]]) -> AsyncIterator[tuple[int, dict]]:
+    '''
+    Groups the rows following a header into events. Yields (line number of the tournament row, event).
+    Only one event is held in memory at a time.
+    '''
+    header, event, start = None, None, 0
+    async for number, line in lines:
+        if not line.strip():
+            continue
+        row = _csv_row(number, line)
+        if header is None:
+            header = [column.strip() for column in row]
+            if "record" not in header:
+                raise InvalidImport(number, "CSV header must have a record column.")
+            continue
+
+        values = {column: value for column, value in zip(header, row) if value != ""}
+        kind = values.get("record")
+        if kind == "tournament":
+            if event is not None:
+                yield start, _finish(event)
+            event, start = {field: values[field] for field in TOURNAMENT_FIELDS if field in values}, number
+            event["players"], event["rounds"] = [], {}
+            continue
+        if event is None:
+            raise InvalidImport(number, f"{kind} row before any tournament row.")
+
+        if kind == "player":
+            event["players"].append({"name": values.get("name"), "rating": values.get("rating")})
+        elif kind in ("round", "matchup"):
+            round_number = values.get("round_number")
+            matchups = event["rounds"].setdefault(round_number, {"round_number": round_number, "matchups": []})["matchups"]
+            if kind == "matchup":
+                matchup = {"white": values.get("white"), "black": values.get("black")}
+                if "result" in values:
+                    matchup["result"] = values["result"]
+                matchups.append(matchup)
+        else:
+            raise InvalidImport(number, f"Unknown record type: {kind}.")
+
+    if event is not None:
+        yield start, _finish(event)
+
+
+def _finish(event: dict) -> dict:
+    event["rounds"] = list(event["rounds"].values())
+    return event
+
+
+def ndjson_event(event: dict) -> bytes:
+    return orjson.dumps(event) + b"\n"
+
+
+def csv_header() -> str:
+    return ",".join(CSV_COLUMNS) + "\r\n"
+
+
+def csv_event(event: dict) -> str:
+    out = io.StringIO()
+    writer = csv.DictWriter(out, CSV_COLUMNS)
+    writer.writerow({"record": "tournament", **{field: event[field] for field in TOURNAMENT_FIELDS}})
+    for player in event["players"]:
+        writer.writerow({"record": "player", "name": player["name"], "rating": player["rating"]})
+    for r in event["rounds"]:
+        if not r["matchups"]:
+            writer.writerow({"record": "round", "round_number": r["round_number"]})
+        for m in r["matchups"]:
+            writer.writerow({"record": "matchup", "round_number": r["round_number"], **m})
+    return out.getvalue()
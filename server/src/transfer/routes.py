@@ -0,0 +1,73 @@
+from fastapi import status, APIRouter, Depends, Request
+from fastapi.responses import StreamingResponse
+from sqlmodel.ext.asyncio.session import AsyncSession
+from src.utils.config import version
+from src.utils.enums import Status, TransferFormat
+from src.utils.streaming import iter_lines
+from src.db import db
+from src.db.db import Session, ReplicaSession, replica_engine
+from src.auth.schemas import Principal
+from src.db.redis import invalidate_user_tournaments_cache, wrote_recently
+from .schemas import ImportSummary
+from .formats import ndjson_records, csv_records
+from .service import TransferService
+
+from src.auth.dependencies import (
+    RoleChecker,
+    get_current_principal
+)
+
+
+router = APIRouter(
+    prefix=f"/api/{version}/transfer",
+    tags=["transfer"]
+)
+
+service = TransferService()
+full_access = RoleChecker(['admin', 'user'])
+
+MEDIA_TYPES = {
+    TransferFormat.NDJSON: "application/x-ndjson",
+    TransferFormat.CSV: "text/csv",
+}
+
+
+# e.g: curl -X POST "{{ _.url }}/import?format=csv" -H "Authorization: Bearer ..." --data-binary @events.csv
+@router.post('/import', response_model=ImportSummary, status_code=status.HTTP_201_CREATED)
+async def import_tournaments(
+    request: Request,
+    format: TransferFormat = TransferFormat.NDJSON,
+    _ : bool = Depends(full_access),
+    session: AsyncSession = Depends(db.get_session),
+    user: Principal = Depends(get_current_principal)
+):
+    '''
+    Imports tournaments with their players, rounds and matchups (see src/transfer/formats.py).
+    The body is parsed while it is uploaded and written with COPY in chunks.
+    All or nothing: an invalid record fails the import with its line number.
+    '''
+    lines = iter_lines(request.stream())
+    records = ndjson_records(lines) if format == TransferFormat.NDJSON else csv_records(lines)
+    summary = await service.import_tournaments(records, user.id, session)
+    await invalidate_user_tournaments_cache(user.id)
+    return summary
+
+
+@router.get('/export', status_code=status.HTTP_200_OK)
+async def export_tournaments(
+    format: TransferFormat = TransferFormat.NDJSON,
+    status: Status | None = None,
+    user: Principal = Depends(get_current_principal)
+):
+    '''
+    Exports the current user's tournaments (optionally one status) in the import format, streamed from server-side cursors.
+    '''
+    Factory = Session
+    if replica_engine is not None and not await wrote_recently(user.id):
+        Factory = ReplicaSession
+    extension = "ndjson" if format == TransferFormat.NDJSON else "csv"
+    return StreamingResponse(
+        service.export_tournaments(user.id, status, format, Factory),
+        media_type=MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="tournaments.{extension}"'}
+    )
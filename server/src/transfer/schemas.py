@@ -0,0 +1,54 @@
+from pydantic import BaseModel, Field, model_validator
+from src.utils.enums import *
+from src.tournament.schemas import TournamentBase
+from src.player.schemas import PlayerCreate
+
+
+class MatchupRecord(BaseModel):
+    white: str # player names, unique within a tournament
+    black: str
+    result: Result = Result.NO_RESULT
+
+
+class RoundRecord(BaseModel):
+    round_number: int = Field(ge=1)
+    matchups: list[MatchupRecord] = []
+
+
+class TournamentRecord(TournamentBase):
+    '''
+    One event of a bulk import/export: the tournament with its players, rounds and matchups.
+    '''
+    players: list[PlayerCreate] = []
+    rounds: list[RoundRecord] = []
+
+    @model_validator(mode="after")
+    def check_event(self):
+        # the default status is not validated, it comes in as the plain value
+        self.status = Status(self.status) if self.status else Status.NOT_STARTED
+        if len(self.players) > self.nb_of_players:
+            raise ValueError("More players than nb_of_players.")
+        names = {p.name for p in self.players}
+        if len(names) != len(self.players):
+            raise ValueError("Player names must be unique within a tournament.")
+        if len({r.round_number for r in self.rounds}) != len(self.rounds):
+            raise ValueError("Round numbers must be unique.")
+        for r in self.rounds:
+            for m in r.matchups:
+                if m.white not in names or m.black not in names:
+                    raise ValueError(f"Round {r.round_number}: unknown player in {m.white} - {m.black}.")
+                if m.white == m.black:
+                    raise ValueError(f"Round {r.round_number}: {m.white} cannot play against themselves.")
+        if self.status == Status.NOT_STARTED and self.rounds:
+            raise ValueError("A tournament that has not started cannot have rounds.")
+        if self.status == Status.ONGOING and self.format not in (Format.ROUND_ROBIN, Format.DOUBLE_ROUND_ROBIN):
+            # Swiss states and brackets are built while the tournament is played, they cannot be imported.
+            raise ValueError(f"Ongoing {self.format.value} tournaments cannot be imported.")
+        return self
+
+
+class ImportSummary(BaseModel):
+    tournaments: int
+    players: int
+    rounds: int
+    matchups: int
@@ -0,0 +1,232 @@
+from typing import AsyncIterator, Callable
+
+from asyncpg.exceptions import UniqueViolationError
+from pydantic import ValidationError
+from sqlalchemy import text
+from sqlalchemy.orm import aliased
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from src.db.models import Tournament, Player, Round, Matchup
+from src.utils.enums import Status, Result, TransferFormat
+from src.utils.errors import InvalidImport
+from .schemas import TournamentRecord
+from .formats import csv_event, csv_header, ndjson_event
+
+# Events validated and copied together. Memory holds one chunk, whatever the size of the import.
+IMPORT_CHUNK_SIZE = 200
+
+# Rows fetched per round trip from the export cursors.
+EXPORT_BATCH_SIZE = 1000
+
+# Ids are taken from the sequences up front, so children can reference parents in the same COPY chunk.
+ALLOCATE_IDS = text('''
+    SELECT
+        ARRAY(SELECT nextval(pg_get_serial_sequence('tournaments', 'id')) FROM generate_series(1, :tournaments)),
+        ARRAY(SELECT nextval(pg_get_serial_sequence('players', 'id')) FROM generate_series(1, :players)),
+        ARRAY(SELECT nextval(pg_get_serial_sequence('rounds', 'id')) FROM generate_series(1, :rounds))
+''')
+
+
+async def driver_connection(session: AsyncSession):
+    '''
+    The asyncpg connection under the session, for COPY. It runs in the session's transaction,
+    as long as the session already sent a statement (the transaction is begun lazily).
+    '''
+    connection = await session.connection()
+    raw = await connection.get_raw_connection()
+    return raw.driver_connection
+
+
+class _Grouped:
+    '''
+    Rows of a stream ordered by tournament id (first column), taken one tournament at a time.
+    '''
+    def __init__(self, rows: AsyncIterator):
+        self._rows = rows
+        self._next = None
+        self._done = False
+
+    async def _peek(self):
+        if self._next is None and not self._done:
+            self._next = await anext(self._rows, None)
+            self._done = self._next is None
+        return self._next
+
+    async def take(self, tournament_id: int) -> list:
+        rows = []
+        while (row := await self._peek()) is not None and row[0] <= tournament_id:
+            if row[0] == tournament_id:
+                rows.append(row)
+            self._next = None
+        return rows
+
+
+class TransferService:
+    async def import_tournaments(self, records: AsyncIterator[tuple[int, dict]], user_id: int, session: AsyncSession) -> dict:
+        '''
+        Validates the events of a stream and writes them with COPY, one chunk at a time, in one transaction:
+        a bad record (reported with its line) saves nothing.
+        Returns the number of rows written per table.
+        '''
+        summary = {"tournaments": 0, "players": 0, "rounds": 0, "matchups": 0}
+        seen = set()
+        chunk = []
+        async for number, record in records:
+            try:
+                event = TournamentRecord.model_validate(record)
+            except ValidationError as exc:
+                raise InvalidImport(number, "Invalid tournament.", exc.errors(include_url=False, include_context=False, include_input=False))
+            if event.name in seen:
+                raise InvalidImport(number, f"Tournament {event.name} appears twice.")
+            seen.add(event.name)
+
+            chunk.append((number, event))
+            if len(chunk) == IMPORT_CHUNK_SIZE:
+                await self.copy_chunk(chunk, user_id, summary, session)
+                chunk = []
+        if chunk:
+            await self.copy_chunk(chunk, user_id, summary, session)
+        await session.commit()
+        return summary
+
+    async def copy_chunk(self, chunk: list[tuple[int, TournamentRecord]], user_id: int, summary: dict, session: AsyncSession):
+        '''
+        Writes validated events: one query for existing names, one for the ids, then one COPY per table.
+        The name check is not a lock: a tournament created meanwhile (another import, create_tournament)
+        makes the COPY hit the unique index, which is reported like a name found by the check.
+        Does not commit.
+        '''
+        lines = {event.name: number for number, event in chunk}
+        result = await session.exec(select(Tournament.name).where(Tournament.name.in_(list(lines))))
+        existing = sorted(result.all(), key=lines.get)
+        if existing:
+            raise InvalidImport(lines[existing[0]], f"Tournament {existing[0]} already exists.")
+
+        events = [event for _, event in chunk]
+        result = await session.exec(ALLOCATE_IDS, params={
+            "tournaments": len(events),
+            "players": sum(len(e.players) for e in events),
+            "rounds": sum(len(e.rounds) for e in events),
+        })
+        tournament_ids, player_ids, round_ids = result.one()
+        player_ids, round_ids = iter(player_ids), iter(round_ids)
+
+        # Enums are stored by name, like the ORM does.
+        tournaments, players, rounds, matchups = [], [], [], []
+        for tournament_id, e in zip(tournament_ids, events):
+            tournaments.append((
+                tournament_id, e.name, e.location, e.time_control.name if e.time_control else None,
+                e.status.name, e.format.name, e.start_date, e.end_date, e.nb_of_players, user_id
+            ))
+            ids = {}
+            for p in e.players:
+                ids[p.name] = next(player_ids)
+                players.append((ids[p.name], p.name, p.rating, tournament_id))
+            for r in e.rounds:
+                round_id = next(round_ids)
+                rounds.append((round_id, r.round_number, tournament_id))
+                matchups.extend((round_id, ids[m.white], ids[m.black], m.result.name) for m in r.matchups)
+
+        driver = await driver_connection(session)
+        try:
+            await driver.copy_records_to_table(
+                "tournaments", records=tournaments,
+                columns=["id", "name", "location", "time_control", "status", "format", "start_date", "end_date", "nb_of_players", "manager_id"]
+            )
+            if players:
+                await driver.copy_records_to_table("players", records=players, columns=["id", "name", "rating", "tournament_id"])
+            if rounds:
+                await driver.copy_records_to_table("rounds", records=rounds, columns=["id", "round_number", "tournament_id"])
+            if matchups:
+                await driver.copy_records_to_table(
+                    "matchups", records=matchups, columns=["round_id", "white_player_id", "black_player_id", "result"]
+                )
+        except UniqueViolationError as exc:
+            # e.g. 'Key (name)=(Spring Open) already exists.'
+            name = next((n for n in lines if f"=({n})" in (exc.detail or "")), None)
+            if name is None:
+                raise InvalidImport(min(lines.values()), f"Duplicate record: {exc.detail or exc}")
+            raise InvalidImport(lines[name], f"Tournament {name} already exists.")
+
+        summary["tournaments"] += len(tournaments)
+        summary["players"] += len(players)
+        summary["rounds"] += len(rounds)
+        summary["matchups"] += len(matchups)
+
+    async def export_tournaments(
+        self,
+        user_id: int,
+        status: Status | None,
+        file_format: TransferFormat,
+        Factory: Callable[[], AsyncSession]
+    ) -> AsyncIterator[bytes]:
+        '''
+        Streams the user's tournaments as events. Tournaments, players and rounds with their matchups
+        are read by three server-side cursors ordered by tournament id and merged on the fly, so
+        memory holds one batch per cursor and one event, however many rows there are.
+        Opens its own session: the response outlives the request's dependencies.
+        '''
+        scope = Tournament.manager_id == user_id
+        if status is not None:
+            scope &= Tournament.status == status
+
+        white, black = aliased(Player), aliased(Player)
+        tournaments_q = (
+            select(
+                Tournament.id, Tournament.name, Tournament.location, Tournament.start_date, Tournament.end_date,
+                Tournament.time_control, Tournament.format, Tournament.status, Tournament.nb_of_players
+            )
+            .where(scope)
+            .order_by(Tournament.id)
+        )
+        players_q = (
+            select(Player.tournament_id, Player.name, Player.rating)
+            .join(Tournament, Tournament.id == Player.tournament_id)
+            .where(scope)
+            .order_by(Player.tournament_id, Player.id)
+        )
+        rounds_q = (
+            select(Round.tournament_id, Round.round_number, white.name, black.name, Matchup.result)
+            .join(Tournament, Tournament.id == Round.tournament_id)
+            .outerjoin(Matchup, Matchup.round_id == Round.id)
+            .outerjoin(white, white.id == Matchup.white_player_id)
+            .outerjoin(black, black.id == Matchup.black_player_id)
+            .where(scope)
+            .order_by(Round.tournament_id, Round.round_number, Matchup.id)
+        )
+
+        async with Factory() as session:
+            # One snapshot for the three cursors.
+            await session.connection(execution_options={"isolation_level": "REPEATABLE READ"})
+            streamed = [
+                await session.stream(q.execution_options(yield_per=EXPORT_BATCH_SIZE))
+                for q in (tournaments_q, players_q, rounds_q)
+            ]
+            tournaments, players, rounds = streamed[0], _Grouped(streamed[1]), _Grouped(streamed[2])
+
+            if file_format == TransferFormat.CSV:
+                yield csv_header().encode()
+            async for t in tournaments:
+                event = {
+                    "name": t.name,
+                    "location": t.location,
+                    "start_date": t.start_date,
+                    "end_date": t.end_date,
+                    "time_control": t.time_control.value if t.time_control else None,
+                    "format": t.format.value if t.format else None,
+                    "status": t.status.value if t.status else None,
+                    "nb_of_players": t.nb_of_players,
+                    "players": [{"name": name, "rating": rating} for _, name, rating in await players.take(t.id)],
+                    "rounds": [],
+                }
+                for _, round_number, white_name, black_name, result in await rounds.take(t.id):
+                    if not event["rounds"] or event["rounds"][-1]["round_number"] != round_number:
+                        event["rounds"].append({"round_number": round_number, "matchups": []})
+                    if white_name is not None:
+                        event["rounds"][-1]["matchups"].append({
+                            "white": white_name,
+                            "black": black_name,
+                            "result": (result or Result.NO_RESULT).value,
+                        })
+                yield ndjson_event(event) if file_format == TransferFormat.NDJSON else csv_event(event).encode()
@@ -31,6 +31,9 @@ app_config = {
 # Takes the db url from .env file
 class Settings(BaseSettings):
     DATABASE_URL: str
+    DATABASE_REPLICA_URL: str | None = None
+    # Seconds a user's reads stay on the primary after they wrote (read your own writes)
+    REPLICA_STICKY_SECONDS: int = 5
     JWT_SECRET: str
     JWT_ALGORITHM: str
     REFRESH_TOKEN_EXPIRY: int
@@ -52,6 +55,34 @@ class Settings(BaseSettings):
     VALIDATE_CERTS: bool = True
     DOMAIN: str
 
+    # In-process cache tier in front of Redis (entries per worker, seconds)
+    LOCAL_CACHE_SIZE: int = 1024
+    LOCAL_CACHE_TTL: int = 30
+    CREDENTIAL_CACHE_SIZE: int = 4096
+    CREDENTIAL_CACHE_TTL: int = 300
+
+    # Password hashing: bcrypt cost, worker threads and max queued hashes before rejecting (503)
+    BCRYPT_ROUNDS: int = 12
+    HASH_WORKERS: int = 4
+    HASH_QUEUE_LIMIT: int = 64
+
+    # Database connection pool (per worker) and asyncpg prepared statement cache
+    DB_POOL_SIZE: int = 10
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: float = 30.0
+    DB_POOL_RECYCLE: int = 1800
+    DB_POOL_PRE_PING: bool = True
+    DB_STATEMENT_CACHE_SIZE: int = 100
+
+    # Shared Lichess HTTP client (connections per worker, seconds)
+    LICHESS_URL: str = "https://lichess.org"
+    LICHESS_HTTP2: bool = True
+    LICHESS_MAX_CONNECTIONS: int = 100
+    LICHESS_MAX_KEEPALIVE: int = 20
+    LICHESS_KEEPALIVE_EXPIRY: float = 30.0
+    LICHESS_TIMEOUT: float = 10.0
+    LICHESS_CONNECT_TIMEOUT: float = 5.0
+
     model_config = SettingsConfigDict(env_file=".env", extra="ignore")
 
 
@@ -1,5 +1,6 @@
 from enum import Enum, unique
 
+
 @unique
 class TimeControl(Enum):
     BULLET = "Bullet"
@@ -7,12 +8,14 @@ class TimeControl(Enum):
     RAPID = "Rapid"
     CLASICCAL = "Classical"
 
+
 @unique
 class Status(Enum):
     NOT_STARTED = "Not Started"
     ONGOING = "Ongoing"
     FINISHED = "Finished"
 
+
 @unique
 class Format(Enum):
     ROUND_ROBIN = "Round-Robin"
@@ -21,9 +24,22 @@ class Format(Enum):
     ELIMINATION = "Elimination"
     DOUBLE_ELIMINATION = "Double-Elimination"
 
+
 @unique
 class Result(Enum):
     NO_RESULT = "No-Result"
     WHITE_WINS = "White-Wins"
     BLACK_WINS = "Black-Wins"
-    DRAW = "Draw"
\ No newline at end of file
+    DRAW = "Draw"
+
+
+@unique
+class TransferFormat(Enum):
+    NDJSON = "ndjson"
+    CSV = "csv"
+
+
+@unique
+class RatingDistribution(Enum):
+    UNIFORM = "uniform"
+    NORMAL = "normal"
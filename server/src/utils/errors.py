@@ -80,6 +80,10 @@ class TournamentFull(Chessly):
     """Tournament is full"""
     pass
 
+class BracketNotFound(Chessly):
+    """Bracket Not found"""
+    pass
+
 
 class AccountNotVerified(Exception):
     """Account not yet verified"""
@@ -108,6 +112,38 @@ class TournamentNotFinished(Exception):
     """Not all games have results. Cannot finish the tournament."""
     pass
 
+class RoundNotFinished(Exception):
+    """Not all games of the current round have results. Cannot pair the next round."""
+    pass
+
+class InvalidTournamentFormat(Exception):
+    """Operation is not supported by the tournament format."""
+    pass
+
+class ResultLocked(Exception):
+    """Result cannot change, the players already moved on to a decided match."""
+    pass
+
+class ResultConflict(Exception):
+    """Result was changed by someone else since it was loaded."""
+    pass
+
+class PasswordHashingBusy(Exception):
+    """Too many password hashes queued, try again later."""
+    pass
+
+class InvalidCursor(Exception):
+    """Pagination cursor is malformed."""
+    pass
+
+class InvalidImport(Chessly):
+    """A bulk import record is malformed or invalid. Nothing of the import is saved."""
+    def __init__(self, line: int, message: str, errors: list | None = None):
+        super().__init__(f"Line {line}: {message}")
+        self.line = line
+        self.message = message
+        self.errors = errors or []
+
 
 def create_exception_handler(
     status_code: int, initial_detail: Any
@@ -183,6 +219,16 @@ def register_all_errors(app: FastAPI):
             },
         ),
     )
+    app.add_exception_handler(
+        BracketNotFound,
+        create_exception_handler(
+            status_code=status.HTTP_404_NOT_FOUND,
+            initial_detail={
+                "message": "Bracket not found. Elimination tournaments get a bracket when they start.",
+                "error_code": "bracket_not_found",
+            },
+        ),
+    )
     app.add_exception_handler(
         InvalidCredentials,
         create_exception_handler(
@@ -325,6 +371,80 @@ def register_all_errors(app: FastAPI):
             },
         ),
     )
+    app.add_exception_handler(
+        RoundNotFinished,
+        create_exception_handler(
+            status_code=status.HTTP_403_FORBIDDEN,
+            initial_detail={
+                "message": "Not all games of the current round have a result.",
+                "error_code": "round_not_finished",
+            },
+        ),
+    )
+    app.add_exception_handler(
+        InvalidTournamentFormat,
+        create_exception_handler(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            initial_detail={
+                "message": "This operation is not supported by the tournament format.",
+                "error_code": "invalid_tournament_format",
+            },
+        ),
+    )
+    app.add_exception_handler(
+        ResultLocked,
+        create_exception_handler(
+            status_code=status.HTTP_403_FORBIDDEN,
+            initial_detail={
+                "message": "Result cannot be changed, a later match depending on it already has a result.",
+                "error_code": "result_locked",
+            },
+        ),
+    )
+    app.add_exception_handler(
+        ResultConflict,
+        create_exception_handler(
+            status_code=status.HTTP_409_CONFLICT,
+            initial_detail={
+                "message": "Results were changed by someone else in the meantime. Reload the round and try again.",
+                "error_code": "result_conflict",
+            },
+        ),
+    )
+
+    app.add_exception_handler(
+        PasswordHashingBusy,
+        create_exception_handler(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            initial_detail={
+                "message": "Server is busy, please try again in a moment.",
+                "error_code": "password_hashing_busy",
+            },
+        ),
+    )
+
+    app.add_exception_handler(
+        InvalidCursor,
+        create_exception_handler(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            initial_detail={
+                "message": "Invalid pagination cursor.",
+                "error_code": "invalid_cursor",
+            },
+        ),
+    )
+
+    @app.exception_handler(InvalidImport)
+    async def invalid_import(request, exc: InvalidImport):
+        return JSONResponse(
+            content={
+                "message": f"Line {exc.line}: {exc.message}",
+                "error_code": "invalid_import",
+                "line": exc.line,
+                "errors": exc.errors,
+            },
+            status_code=status.HTTP_400_BAD_REQUEST,
+        )
 
     @app.exception_handler(500)
     async def internal_server_error(request, exc):
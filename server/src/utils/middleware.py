@@ -5,6 +5,7 @@ from fastapi.middleware.cors import CORSMiddleware
 from fastapi.middleware.trustedhost import TrustedHostMiddleware
 import time
 import logging
+from .pagination import NEXT_CURSOR_HEADER
 
 # logger = logging.getLogger("uvicorn.access")
 # logger.disabled = True
@@ -39,6 +40,7 @@ def register_middleware(app: FastAPI):
         ],
         allow_methods=["*"],
         allow_headers=["*"],
+        expose_headers=[NEXT_CURSOR_HEADER],
         allow_credentials=True,
     )
 
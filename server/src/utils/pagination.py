@@ -0,0 +1,56 @@
+'''
+Keyset (cursor) pagination.
+
+A page is read with WHERE (sort value, id) < / > (last seen) ORDER BY sort value, id,
+so every page costs one index range scan, however deep it is. The cursor handed to
+the client is the opaque, url safe encoding of the last row's (sort value, id).
+'''
+import base64
+
+import orjson
+from sqlalchemy import tuple_, asc, desc
+
+from src.utils.errors import InvalidCursor
+
+# Response header carrying the cursor of the next page (absent on the last page).
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def encode_cursor(*values) -> str:
+    return base64.urlsafe_b64encode(orjson.dumps(values)).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, *parsers) -> tuple:
+    '''
+    Decodes a cursor and converts every value with its parser (e.g. date.fromisoformat, int).
+    '''
+    try:
+        values = orjson.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        if not isinstance(values, list) or len(values) != len(parsers):
+            raise ValueError(cursor)
+        return tuple(parse(value) for parse, value in zip(parsers, values))
+    except (ValueError, TypeError):
+        raise InvalidCursor()
+
+
+def keyset(statement, columns: tuple, after: tuple | None, descending: bool, limit: int):
+    '''
+    Orders the statement by columns (the last one unique, e.g. id) and starts after the given values.
+    Fetches one extra row, so the caller knows if there is a next page (see page()).
+    '''
+    if after is not None:
+        key = tuple_(*columns)
+        statement = statement.where(key < tuple_(*after) if descending else key > tuple_(*after))
+    order = desc if descending else asc
+    return statement.order_by(*(order(column) for column in columns)).limit(limit + 1)
+
+
+def page(rows: list, limit: int, key) -> tuple[list, str | None]:
+    '''
+    Splits off the extra row fetched by keyset(). Returns (rows, next cursor or None).
+    key returns the cursor values of a row.
+    '''
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    return rows, encode_cursor(*key(rows[-1]))
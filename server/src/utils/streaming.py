@@ -0,0 +1,38 @@
+'''
+Line splitting for streamed bodies (Lichess NDJSON streams, bulk imports).
+'''
+from typing import AsyncIterator
+
+
+def split_lines(buffer: bytearray, chunk: bytes) -> list[bytes]:
+    '''
+    Appends a chunk and pops the complete lines off the front of the buffer.
+    Only the new chunk is scanned and the buffer is trimmed once per chunk.
+    '''
+    start = len(buffer)
+    buffer += chunk
+    lines = []
+    begin = 0
+    end = buffer.find(b"\n", start)
+    while end != -1:
+        lines.append(bytes(buffer[begin:end]))
+        begin = end + 1
+        end = buffer.find(b"\n", begin)
+    if begin:
+        del buffer[:begin]
+    return lines
+
+
+async def iter_lines(chunks: AsyncIterator[bytes]) -> AsyncIterator[tuple[int, bytes]]:
+    '''
+    Yields (line number, line) from a stream of byte chunks, including a last line without newline.
+    Line endings (\\n or \\r\\n) are stripped.
+    '''
+    buffer = bytearray()
+    number = 0
+    async for chunk in chunks:
+        for line in split_lines(buffer, chunk):
+            number += 1
+            yield number, line.rstrip(b"\r")
+    if buffer:
+        yield number + 1, bytes(buffer).rstrip(b"\r")